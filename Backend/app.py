@@ -1,10 +1,19 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS
 import firebase_admin
 from firebase_admin import credentials
 
+from commands import register_commands
+from database import configure_database
 from extensions import db          # Import db from our new extensions file
-from routes import register_routes # This is now safe to import
+from metrics import init_metrics, registry
+from models import upgrade_schema
+from routes import register_routes, token_cache # This is now safe to import
+from response_cache import response_cache, RedisCacheBackend
+from search import create_search_index
+from token_cache import start_cert_prefetch
 
 def create_app():
     """Application Factory Function"""
@@ -13,23 +22,42 @@ def create_app():
     if not firebase_admin._apps:
         cred = credentials.Certificate("serviceAccountKey.json")
         firebase_admin.initialize_app(cred)
+        # Refresh Google's signing certs in the background so requests never wait on them
+        start_cert_prefetch()
 
     # Create the Flask app instance
     app = Flask(__name__)
 
     # Configure CORS to allow requests from your frontend
     # Using "*" is simple and effective for local development
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # X-Next-Cursor carries the keyset pagination cursor for listing endpoints
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
 
-    # Configure the database URI
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///internhub.db"
+    # Configure the database URI, pool and optional read replica from the environment
+    configure_database(app)
     
+    # Share cached responses across workers when a Redis-compatible server is configured
+    if os.environ.get("RESPONSE_CACHE_URL"):
+        import redis
+        response_cache.backend = RedisCacheBackend(redis.Redis.from_url(os.environ["RESPONSE_CACHE_URL"]))
+
     # Connect the db extension (from extensions.py) to our Flask app
     db.init_app(app)
 
+    # Record per-endpoint latency and timing breakdowns, served at /metrics
+    init_metrics(app)
+    registry.add_cache('response', response_cache)
+    registry.add_cache('token', token_cache)
+
     # Register all the API routes from routes.py
     register_routes(app, db)
 
+    # Register the 'flask' CLI commands from commands.py
+    register_commands(app)
+
+    # Where 'flask build-skill-index' writes the recommendation index and workers load it from
+    app.config['SKILL_INDEX_PATH'] = os.environ.get("SKILL_INDEX_PATH", "skill_index.npz")
+
     return app
 
 # Create the app instance using the factory
@@ -40,6 +68,10 @@ if __name__ == '__main__':
     with app.app_context():
         # This will create database tables if they don't exist
         db.create_all()
+        # create_all skips tables that already exist, so add any constraints and indexes they predate
+        upgrade_schema()
+        # The FTS index is a virtual table, so create_all doesn't know about it
+        create_search_index()
     
     # Run the development server
     app.run(debug=True)
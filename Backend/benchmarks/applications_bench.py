@@ -0,0 +1,97 @@
+"""Measures the apply and applicant-triage endpoints on an internship with many applicants.
+
+Run from the backend directory:
+
+    python -m benchmarks.applications_bench --applicants 50000 200000
+"""
+import argparse
+import datetime
+import itertools
+
+from sqlalchemy import text
+
+from benchmarks.harness import add_user, app, authenticate_as_uid, bearer, db, reset_database, timings
+from models import Application, Internship
+from routes import MAX_BULK_STATUS_UPDATE, encode_cursor
+
+# Applicants a minute apart, cycling through the statuses
+SEED_SQL = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :count)
+INSERT INTO {table} {columns}
+SELECT {values} FROM n
+"""
+STUDENTS = ("user", "(id, email, name, role)",
+            "'student-' || i, 'student-' || i || '@example.com', 'Student ' || i, 'student'")
+APPLICATIONS = ("application", "(student_id, internship_id, status, applied_at)",
+                "'student-' || i, :internship_id, "
+                "CASE i % 4 WHEN 0 THEN 'pending' WHEN 1 THEN 'reviewed' WHEN 2 THEN 'accepted' ELSE 'rejected' END, "
+                "datetime('now', '-' || i || ' minutes')")
+
+def seed(applicants, repeat):
+    reset_database()
+    add_user('bench-company')
+    internship = Internship(title='Backend Intern', description='APIs', domain='Software Development',
+                            company_name='Acme', company_id='bench-company', location_type='remote',
+                            duration='3 months', application_deadline=datetime.datetime(2100, 1, 1))
+    db.session.add(internship)
+    db.session.commit()
+    # Students past the seeded applicants are left to apply during the run
+    for (table, columns, values), count in ((STUDENTS, applicants + repeat + 1), (APPLICATIONS, applicants)):
+        db.session.execute(text(SEED_SQL.format(table=table, columns=columns, values=values)),
+                           {'count': count, 'internship_id': internship.id})
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return internship.id
+
+def deep_cursor(internship_id, applicants):
+    """Returns the cursor a company would hold halfway down the applicants."""
+    applied_at, application_id = (
+        db.session.query(Application.applied_at, Application.id)
+        .filter_by(internship_id=internship_id)
+        .order_by(Application.applied_at.desc(), Application.id.desc())
+        .offset(applicants // 2)
+        .first()
+    )
+    return encode_cursor(applied_at, application_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--applicants', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    authenticate_as_uid()
+    client = app.test_client()
+    company = bearer('bench-company')
+    print(f"{'applicants':>10}  {'request':<24}{'p50 ms':>9}{'p99 ms':>9}")
+    for applicants in args.applicants:
+        with app.app_context():
+            internship_id = seed(applicants, args.repeat)
+            cursor = deep_cursor(internship_id, applicants)
+            batch = [i for i, in db.session.query(Application.id).filter_by(internship_id=internship_id)
+                     .limit(MAX_BULK_STATUS_UPDATE)]
+        url = f'/api/internships/{internship_id}/applications'
+        new_students = itertools.count(applicants + 1)
+        statuses = itertools.cycle(Application.STATUSES)
+
+        def call(method, path, expected, **kwargs):
+            response = client.open(path, method=method, **kwargs)
+            assert response.status_code == expected, response.data
+
+        apply_url = f'/api/internships/{internship_id}/apply'
+        cases = [
+            ('apply', lambda: call('POST', apply_url, 201, headers=bearer(f'student-{next(new_students)}'))),
+            ('apply (repeat)', lambda: call('POST', apply_url, 200, headers=bearer('student-1'))),
+            ('applicants first page', lambda: call('GET', url, 200, headers=company)),
+            ('applicants deep page', lambda: call('GET', url, 200, headers=company, query_string={'cursor': cursor})),
+            ('applicants ?status=', lambda: call('GET', url, 200, headers=company,
+                                                 query_string={'status': 'accepted'})),
+            (f'PATCH {len(batch)} ids', lambda: call('PATCH', url, 200, headers=company,
+                                                      json={'status': next(statuses), 'applicationIds': batch})),
+        ]
+        for name, func in cases:
+            p50, p99 = timings(func, args.repeat)
+            print(f"{applicants:>10}  {name:<24}{p50:>9.2f}{p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
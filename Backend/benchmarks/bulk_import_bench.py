@@ -0,0 +1,51 @@
+"""Measures bulk import throughput in rows per second, with and without the FTS sync triggers.
+
+Run from the backend directory:
+
+    python -m benchmarks.bulk_import_bench --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.harness import add_user, app, db, reset_database
+from bulk_import import import_internships, read_ndjson
+from sqlalchemy import text
+
+FTS_TRIGGERS = ('internship_fts_insert', 'internship_fts_delete', 'internship_fts_update')
+
+def ndjson_lines(count):
+    for i in range(count):
+        yield json.dumps({
+            'title': f'Intern {i}', 'description': f'Help the team ship feature {i} with Python and SQL',
+            'domain': 'Software Development', 'locationType': 'remote', 'city': 'Pune', 'country': 'India',
+            'duration': '3 months', 'stipendAmount': 1000 + i % 500, 'applicationDeadline': '2030-01-01',
+        }).encode() + b'\n'
+
+def run(size, fts_triggers):
+    reset_database()
+    add_user('bench-company')
+    if not fts_triggers:
+        for trigger in FTS_TRIGGERS:
+            db.session.execute(text(f'DROP TRIGGER {trigger}'))
+        db.session.commit()
+    start = time.perf_counter()
+    result = import_internships(read_ndjson(ndjson_lines(size)), 'bench-company', 'Acme')
+    elapsed = time.perf_counter() - start
+    assert result['inserted'] == size, result['errors'][:3]
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'FTS triggers':<13}{'seconds':>9}{'rows/s':>10}")
+    with app.app_context():
+        for size in args.sizes:
+            for fts_triggers in (True, False):
+                elapsed = run(size, fts_triggers)
+                print(f"{size:>9}  {'on' if fts_triggers else 'off':<13}{elapsed:>9.1f}{size / elapsed:>10.0f}")
+
+if __name__ == '__main__':
+    main()
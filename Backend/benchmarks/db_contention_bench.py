@@ -0,0 +1,117 @@
+"""Measures throughput and "database is locked" errors with several processes writing and reading one SQLite file.
+
+Each process runs a mix of single-row INSERT transactions and newest-first
+page reads, while one more streams the whole table to a slow client like an
+NDJSON export. Without WAL that open read blocks every writer until it ends,
+which is where "database is locked" came from. The 'before' run uses
+SQLite's defaults (rollback journal, full sync), the 'after' run the
+SQLITE_PRAGMAS every app connection gets. Run from the backend directory:
+
+    python -m benchmarks.db_contention_bench --processes 8 --seconds 10
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, exc, select
+from sqlalchemy.engine import Engine
+
+from database import apply_sqlite_pragmas
+from extensions import db
+from models import Internship, User
+
+INTERNSHIPS = Internship.__table__
+
+def make_engine(path, pragmas):
+    # The pragma listener is registered for every Engine on import, so the 'before' run takes it off again
+    if not pragmas and event.contains(Engine, 'connect', apply_sqlite_pragmas):
+        event.remove(Engine, 'connect', apply_sqlite_pragmas)
+    return create_engine(f"sqlite:///{path}")
+
+def posting(now):
+    return dict(title='Intern', description='Contention benchmark posting', domain='Data', company_name='Acme',
+                company_id='bench-company', location_type='remote', duration='3 months',
+                application_deadline=now, created_at=now)
+
+def setup(path, pragmas, rows):
+    engine = make_engine(path, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id='bench-company', email='bench@example.com',
+                                                    name='Acme', role='company'))
+        conn.execute(INTERNSHIPS.insert(), [posting(datetime.datetime.utcnow())] * rows)
+    engine.dispose()
+
+def exporter(path, pragmas, seconds):
+    """Streams the table over and over, pausing between chunks as if the client were reading slowly."""
+    engine = make_engine(path, pragmas)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        with engine.connect() as conn:
+            for _ in conn.execution_options(yield_per=1000).execute(select(INTERNSHIPS)).partitions():
+                time.sleep(0.05)
+    engine.dispose()
+
+def worker(path, pragmas, seconds, write_share, seed, results):
+    engine = make_engine(path, pragmas)
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    page = (select(INTERNSHIPS.c.id, INTERNSHIPS.c.title)
+            .order_by(INTERNSHIPS.c.created_at.desc(), INTERNSHIPS.c.id.desc()).limit(20))
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if rng.random() < write_share:
+                with engine.begin() as conn:
+                    conn.execute(INTERNSHIPS.insert().values(**posting(datetime.datetime.utcnow())))
+                writes += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(page).all()
+                reads += 1
+        except exc.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            errors += 1
+    engine.dispose()
+    results.put((reads, writes, errors))
+
+def run(processes, seconds, write_share, rows, pragmas):
+    path = os.path.join(tempfile.mkdtemp(prefix='internhub-bench-'), 'contention.db')
+    # Setup runs in its own process too, so turning the pragmas off never touches this one
+    seeder = multiprocessing.Process(target=setup, args=(path, pragmas, rows))
+    seeder.start()
+    seeder.join()
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(path, pragmas, seconds, write_share, seed, results))
+               for seed in range(processes)]
+    workers.append(multiprocessing.Process(target=exporter, args=(path, pragmas, seconds)))
+    for process in workers:
+        process.start()
+    totals = [sum(counts) for counts in zip(*(results.get() for _ in range(processes)))]
+    for process in workers:
+        process.join()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-share', type=float, default=0.2, help="Fraction of operations that write.")
+    parser.add_argument('--rows', type=int, default=50000, help="Postings seeded before the run, read by the export.")
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes and one export, {args.seconds:g}s, {args.write_share:.0%} writes")
+    print(f"{'run':<8}{'reads/s':>9}{'writes/s':>10}{'locked errors':>15}{'error rate':>12}")
+    for name, pragmas in (('before', False), ('after', True)):
+        reads, writes, errors = run(args.processes, args.seconds, args.write_share, args.rows, pragmas)
+        attempts = reads + writes + errors
+        print(f"{name:<8}{reads / args.seconds:>9.0f}{writes / args.seconds:>10.0f}{errors:>15}"
+              f"{errors / attempts:>12.2%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Shared setup for the database-backed benchmarks.
+
+Importing this module points the app at a throwaway SQLite file and
+initialises Firebase (so create_app skips the certificate prefetch), so
+import it before anything that imports the app.
+"""
+import os
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix='internhub-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.pop('DATABASE_REPLICA_URL', None)
+os.environ.pop('RESPONSE_CACHE_URL', None)
+
+import firebase_admin
+from firebase_admin import auth, credentials
+
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(credentials.Certificate('serviceAccountKey.json'))
+
+from sqlalchemy import text
+
+from app import app
+from extensions import db
+from models import User
+from search import create_search_index
+
+DATABASE_PATH = os.path.join(_db_dir, 'bench.db')
+
+def reset_database():
+    """Drops and recreates every table, including the FTS index and its triggers."""
+    db.session.remove()
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP TABLE IF EXISTS internship_fts'))
+    db.drop_all()
+    db.create_all()
+    create_search_index()
+
+def add_user(uid, role='company', **fields):
+    db.session.add(User(id=uid, email=f'{uid}@example.com', name=fields.pop('name', uid), role=role))
+    db.session.commit()
+
+def authenticate_as_uid():
+    """Makes bearer tokens stand for the caller's uid, as in the test suite."""
+    auth.verify_id_token = lambda id_token: {'uid': id_token, 'exp': time.time() + 3600}
+
+def bearer(uid):
+    return {'Authorization': f'Bearer {uid}'}
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+def timings(func, repeat):
+    """Calls func repeat times and returns (p50_ms, p99_ms)."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, percentile(latencies, 0.99) * 1000
@@ -0,0 +1,96 @@
+"""Measures GET /api/internships latency as the table grows, with the response cache disabled.
+
+Run from the backend directory (the 1M-row step takes a few minutes to seed):
+
+    python -m benchmarks.listing_bench --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from benchmarks.harness import add_user, app, db, reset_database, timings
+from models import Internship
+from response_cache import MemoryCacheBackend, response_cache
+from routes import encode_cursor
+
+# Rows are spread over these values, so each filter matches a fixed share of the table. Each
+# step adds older postings, a minute apart, that stay open for up to 90 days like real ones.
+SEED_SQL = """
+WITH RECURSIVE n(i) AS (SELECT :start UNION ALL SELECT i + 1 FROM n WHERE i < :stop)
+INSERT INTO internship (title, description, domain, company_name, company_id, location_type, city, country,
+                        duration, stipend_amount, stipend_currency, application_deadline, created_at)
+SELECT 'Intern ' || i, 'Description for posting ' || i,
+       CASE i % 5 WHEN 0 THEN 'Design' WHEN 1 THEN 'Data' WHEN 2 THEN 'Marketing' ELSE 'Software Development' END,
+       'Acme', 'bench-company',
+       CASE i % 3 WHEN 0 THEN 'remote' WHEN 1 THEN 'hybrid' ELSE 'onsite' END,
+       CASE i % 4 WHEN 0 THEN 'Pune' ELSE 'Berlin' END,
+       CASE i % 4 WHEN 0 THEN 'India' ELSE 'Germany' END,
+       '3 months', (i % 20) * 100, '$',
+       datetime('now', '-' || i || ' minutes', '+' || (i % 90) || ' days'),
+       datetime('now', '-' || i || ' minutes')
+FROM n
+"""
+
+SCENARIOS = {
+    'first page': {},
+    'deep page': {'cursor': None},
+    'domain': {'domain': 'Design'},
+    'country': {'country': 'India'},
+    'country+city': {'country': 'India', 'city': 'Pune'},
+    'minStipend': {'minStipend': '1500'},
+    # Only the top stipend band (5% of rows), then a threshold no posting reaches
+    'minStipend 5%': {'minStipend': '1900'},
+    'minStipend none': {'minStipend': '100000'},
+    'open': {'open': 'true'},
+}
+
+def seed(start, stop):
+    db.session.execute(text(SEED_SQL), {'start': start, 'stop': stop})
+    db.session.commit()
+
+def measure(client, query_string, requests):
+    def get():
+        response = client.get('/api/internships', query_string=query_string)
+        assert response.status_code == 200, response.data
+    return timings(get, requests)
+
+def deep_cursor(size):
+    """Returns the cursor a client would hold halfway down the table."""
+    created_at, internship_id = (
+        db.session.query(Internship.created_at, Internship.id)
+        .order_by(Internship.created_at.desc(), Internship.id.desc())
+        .offset(size // 2)
+        .first()
+    )
+    return encode_cursor(created_at, internship_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    # A zero-sized store turns every request into a miss, so the query itself is timed
+    response_cache.backend = MemoryCacheBackend(max_entries=0)
+    client = app.test_client()
+    with app.app_context():
+        reset_database()
+        add_user('bench-company')
+
+        seeded = 0
+        print(f"{'rows':>9}  {'scenario':<16}{'p50 ms':>9}{'p99 ms':>9}")
+        for size in sorted(args.sizes):
+            start = time.perf_counter()
+            seed(seeded + 1, size)
+            seeded = size
+            db.session.execute(text("ANALYZE"))
+            print(f"# seeded {size} rows in {time.perf_counter() - start:.1f}s")
+            for name, query_string in SCENARIOS.items():
+                if 'cursor' in query_string:
+                    query_string = {'cursor': deep_cursor(size)}
+                p50, p99 = measure(client, query_string, args.requests)
+                print(f"{size:>9}  {name:<16}{p50:>9.2f}{p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
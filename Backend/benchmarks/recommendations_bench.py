@@ -0,0 +1,69 @@
+"""Measures SkillIndex build time, memory footprint and query latency over synthetic postings.
+
+Run from the backend directory:
+
+    python -m benchmarks.recommendations_bench --postings 200000
+"""
+import argparse
+import datetime
+import random
+import resource
+import statistics
+import time
+
+from recommendations import SkillIndex
+
+SKILLS = [f'skill{i}' for i in range(5000)] + ['python', 'sql', 'react', 'flask', 'excel', 'figma', 'java', 'c++']
+FILLER = [f'word{i}' for i in range(20000)]
+
+def synthetic_rows(count, seed=0):
+    """Yields (id, title, description, domain, deadline) rows whose skill words follow a Zipf-like spread."""
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    skill_weights = [1 / (rank + 1) for rank in range(len(SKILLS))]
+    for internship_id in range(1, count + 1):
+        skills = rng.choices(SKILLS, weights=skill_weights, k=8)
+        description = ' '.join(skills + rng.choices(FILLER, k=60))
+        deadline = now + datetime.timedelta(days=rng.randint(-30, 90))
+        yield internship_id, ' '.join(skills[:3]) + ' intern', description, rng.choice(SKILLS[:50]), deadline
+
+def peak_rss():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = list(synthetic_rows(args.postings))
+    index = SkillIndex()
+    rss_before = peak_rss()
+    start = time.perf_counter()
+    index.build(rows)
+    build_seconds = time.perf_counter() - start
+    build_peak = peak_rss() - rss_before
+
+    rng = random.Random(1)
+    latencies = []
+    for _ in range(args.queries):
+        skills = ', '.join(rng.sample(SKILLS[:500], 5))
+        start = time.perf_counter()
+        index.recommend(skills, args.k)
+        latencies.append(time.perf_counter() - start)
+
+    print(f"postings:        {len(index)}")
+    print(f"build time:      {build_seconds:.1f} s")
+    print(f"build peak RSS:  +{build_peak / 2**20:.1f} MiB")
+    print(f"index arrays:    {index.nbytes / 2**20:.1f} MiB")
+    print(f"query p50:       {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"query p99:       {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
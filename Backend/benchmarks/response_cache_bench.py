@@ -0,0 +1,106 @@
+"""Measures the response cache under a read-heavy load: hit rate, and throughput with and without it.
+
+Threads replay a skewed mix of listing and search URLs, as a few popular
+pages take most of the traffic, and every --write-every requests one of
+them posts an internship, which invalidates every cached read. Run from
+the backend directory:
+
+    python -m benchmarks.response_cache_bench --requests 20000 --threads 8
+"""
+import argparse
+import concurrent.futures
+import itertools
+import random
+import threading
+import time
+
+from sqlalchemy import text
+
+from benchmarks.harness import add_user, app, authenticate_as_uid, bearer, db, reset_database
+from response_cache import MemoryCacheBackend, response_cache
+
+SEED_SQL = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :count)
+INSERT INTO internship (title, description, domain, company_name, company_id, location_type, city, country,
+                        duration, stipend_amount, application_deadline, created_at)
+SELECT 'Intern ' || i, 'Work with Python and SQL on project ' || i,
+       CASE i % 3 WHEN 0 THEN 'Design' WHEN 1 THEN 'Data' ELSE 'Software Development' END,
+       'Acme', 'bench-company', CASE i % 2 WHEN 0 THEN 'remote' ELSE 'onsite' END,
+       'Pune', CASE i % 4 WHEN 0 THEN 'India' ELSE 'Germany' END, '3 months', (i % 20) * 100,
+       datetime('now', '+30 days'), datetime('now', '-' || i || ' minutes')
+FROM n
+"""
+
+# Most popular first; requests pick them with weight 1 / rank
+URLS = [
+    '/api/internships',
+    '/api/internships?domain=Data',
+    '/api/internships?locationType=remote',
+    '/api/internships?country=India',
+    '/api/internships/search?q=python',
+    '/api/internships?domain=Design',
+    '/api/internships?minStipend=1000',
+    '/api/internships?limit=50',
+    '/api/internships/search?q=project',
+    '/api/internships?country=Germany&locationType=onsite',
+] + [f'/api/internships/search?q=project+{i}' for i in range(1, 41)]
+WEIGHTS = [1 / rank for rank in range(1, len(URLS) + 1)]
+
+NEW_INTERNSHIP = {
+    'title': 'Backend Intern', 'description': 'APIs', 'domain': 'Data', 'locationType': 'remote',
+    'duration': '3 months', 'applicationDeadline': '2100-01-01',
+}
+
+def run(requests, threads, write_every, cached):
+    response_cache.backend = MemoryCacheBackend() if cached else MemoryCacheBackend(max_entries=0)
+    hits, misses = response_cache.hits, response_cache.misses
+    counter = itertools.count(1)
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        while True:
+            with lock:
+                n = next(counter)
+            if n > requests:
+                return
+            if write_every and n % write_every == 0:
+                response = client.post('/api/internships', json=NEW_INTERNSHIP, headers=bearer('bench-company'))
+                assert response.status_code == 201, response.data
+            else:
+                response = client.get(rng.choices(URLS, WEIGHTS)[0])
+                assert response.status_code == 200, response.data
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+    hits, misses = response_cache.hits - hits, response_cache.misses - misses
+    return requests / elapsed, hits / (hits + misses) if hits + misses else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--write-every', type=int, default=500, help="Post an internship every N requests; 0 for none.")
+    args = parser.parse_args()
+
+    authenticate_as_uid()
+    with app.app_context():
+        reset_database()
+        add_user('bench-company')
+        db.session.execute(text(SEED_SQL), {'count': args.postings})
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    print(f"{args.postings} postings, {args.requests} requests on {args.threads} threads, "
+          f"a write every {args.write_every or 'never'}")
+    print(f"{'cache':<8}{'requests/s':>12}{'hit rate':>10}")
+    for cached in (False, True):
+        throughput, hit_rate = run(args.requests, args.threads, args.write_every, cached)
+        print(f"{'on' if cached else 'off':<8}{throughput:>12.0f}{hit_rate:>10.1%}")
+
+if __name__ == '__main__':
+    main()
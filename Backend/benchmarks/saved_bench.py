@@ -0,0 +1,76 @@
+"""Measures statements per request and latency of the saved-internship endpoints for a student with many saves.
+
+The 'lazy load' row reproduces the old GET handler, which loaded each saved
+posting with its own SELECT, for comparison. Run from the backend directory:
+
+    python -m benchmarks.saved_bench --saved 1000
+"""
+import argparse
+import datetime
+
+from benchmarks.harness import add_user, app, authenticate_as_uid, bearer, db, reset_database, timings
+from database import record_queries
+from models import Internship, SavedInternship
+
+STUDENT = 'bench-student'
+
+def seed(count):
+    reset_database()
+    add_user('bench-company')
+    add_user(STUDENT, role='student')
+    deadline = datetime.datetime.utcnow() + datetime.timedelta(days=30)
+    internships = [
+        Internship(title=f'Intern {i}', description=f'Description for posting {i}', domain='Data',
+                   company_name='Acme', company_id='bench-company', location_type='remote',
+                   duration='3 months', stipend_amount=1000, application_deadline=deadline)
+        for i in range(count + 1)
+    ]
+    db.session.add_all(internships)
+    db.session.flush()
+    db.session.add_all(SavedInternship(student_id=STUDENT, internship_id=i.id) for i in internships[:count])
+    db.session.commit()
+    # The last posting stays unsaved, for the save/unsave round trip
+    return internships[0].id, internships[-1].id
+
+def lazy_load_saved():
+    saved = SavedInternship.query.filter_by(student_id=STUDENT).all()
+    body = [s.internship.to_dict() for s in saved]
+    db.session.remove()
+    return body
+
+def count_statements(request):
+    with record_queries() as statements:
+        request()
+    return len(statements)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--saved', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    authenticate_as_uid()
+    client = app.test_client()
+    headers = bearer(STUDENT)
+    with app.app_context():
+        saved_id, unsaved_id = seed(args.saved)
+
+    save = lambda: client.post(f'/api/internships/{unsaved_id}/save', headers=headers)
+    unsave = lambda: client.delete(f'/api/internships/{unsaved_id}/save', headers=headers)
+    cases = [
+        ('GET /api/me/saved', lambda: client.get('/api/me/saved', headers=headers)),
+        ('GET (lazy load)', lazy_load_saved),
+        ('POST save (repeat)', lambda: client.post(f'/api/internships/{saved_id}/save', headers=headers)),
+        # Each save is undone straight away, so every one finds the posting unsaved
+        ('POST + DELETE save', lambda: (save(), unsave())),
+    ]
+    print(f"{args.saved} saved internships")
+    print(f"{'request':<20}{'statements':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    with app.app_context():
+        for name, request in cases:
+            statements = count_statements(request)
+            p50, p99 = timings(request, args.repeat)
+            print(f"{name:<20}{statements:>11}{p50:>9.2f}{p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
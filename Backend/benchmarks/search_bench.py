@@ -0,0 +1,65 @@
+"""Compares FTS5 search with the LIKE substring scan other databases fall back to.
+
+Both fetch the first page of results on the same corpus; FTS5 ranks by
+BM25 and the substring scan by recency, so a common term is cheap for LIKE
+(the first page turns up early in the recency index) and expensive for
+FTS5 (every match is scored), while rare or absent terms are the reverse.
+Run from the backend directory:
+
+    python -m benchmarks.search_bench --postings 500000
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from benchmarks.harness import add_user, app, db, reset_database, timings
+from routes import DEFAULT_PAGE_SIZE
+from search import internship_search_query, substring_search_query
+
+# Every fifth posting mentions python, one in a thousand kubernetes and none zookeeper
+SEED_SQL = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :count)
+INSERT INTO internship (title, description, domain, company_name, company_id, location_type,
+                        duration, application_deadline, created_at)
+SELECT CASE i % 5 WHEN 0 THEN 'Python Intern' WHEN 1 THEN 'Data Analyst' WHEN 2 THEN 'Designer'
+                  WHEN 3 THEN 'Marketing Intern' ELSE 'Frontend Intern' END,
+       'Join team ' || i || ' to work on '
+           || CASE i % 4 WHEN 0 THEN 'reporting dashboards' WHEN 1 THEN 'customer research'
+                         WHEN 2 THEN 'internal tools' ELSE 'the mobile app' END
+           || CASE WHEN i % 1000 = 0 THEN ' running on kubernetes' ELSE '' END
+           || ', with mentoring and a weekly demo.',
+       'Software Development', 'Acme', 'bench-company', 'remote', '3 months',
+       datetime('now', '+30 days'), datetime('now', '-' || i || ' minutes')
+FROM n
+"""
+
+QUERIES = {
+    'common (20%)': 'python',
+    'rare (0.1%)': 'kubernetes',
+    'no match': 'zookeeper',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        reset_database()
+        add_user('bench-company')
+        start = time.perf_counter()
+        db.session.execute(text(SEED_SQL), {'count': args.postings})
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        print(f"# seeded {args.postings} postings in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<14}{'engine':<8}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, q in QUERIES.items():
+            for engine, build in (('FTS5', internship_search_query), ('LIKE', substring_search_query)):
+                p50, p99 = timings(lambda: build(q).limit(DEFAULT_PAGE_SIZE + 1).all(), args.repeat)
+                print(f"{name:<14}{engine:<8}{p50:>9.2f}{p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Measures internship serialisation throughput in rows per second.
+
+Compares ORM objects through to_dict and jsonify with column tuples
+through InternshipProjection and dumps, with and without orjson. Rows
+are fetched once up front, so only building and encoding are timed.
+Run from the backend directory:
+
+    python -m benchmarks.serializers_bench --rows 100000
+"""
+import argparse
+import datetime
+import time
+
+from flask import jsonify
+
+import serializers
+from benchmarks.harness import add_user, app, db, reset_database
+from models import Internship
+from serializers import InternshipProjection, dumps
+
+def seed(count):
+    reset_database()
+    add_user('bench-company')
+    deadline = datetime.datetime.utcnow() + datetime.timedelta(days=30)
+    db.session.add_all(
+        Internship(title=f'Intern {i}', description=f'Help the team ship feature {i} with Python and SQL',
+                   domain='Software Development', company_name='Acme', company_id='bench-company',
+                   location_type='remote', city='Pune', country='India', duration='3 months',
+                   # Every tenth posting has no stipend
+                   stipend_amount=None if i % 10 == 0 else 1000 + i % 500, application_deadline=deadline)
+        for i in range(count)
+    )
+    db.session.commit()
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def rate(func, rows, repeat):
+    return rows / min(timed(func) for _ in range(repeat))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per path; the fastest is reported.")
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.rows)
+        db.session.expunge_all()
+        projection = InternshipProjection()
+        objects = Internship.query.all()
+        rows = db.session.query(*projection.columns).all()
+        orjson = serializers.orjson
+
+        def stdlib_dumps():
+            serializers.orjson = None
+            try:
+                dumps([projection.to_dict(row) for row in rows])
+            finally:
+                serializers.orjson = orjson
+
+        with app.test_request_context():
+            paths = [
+                ('to_dict + jsonify', lambda: jsonify([i.to_dict() for i in objects])),
+                ('projection + dumps (stdlib)', stdlib_dumps),
+            ]
+            if orjson:
+                paths.append(('projection + dumps (orjson)', lambda: dumps([projection.to_dict(row) for row in rows])))
+            print(f"{args.rows} rows")
+            print(f"{'path':<30}{'rows/s':>12}")
+            for name, func in paths:
+                print(f"{name:<30}{rate(func, args.rows, args.repeat):>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import csv
+import datetime
+import json
+
+from models import db, Internship, TableVersion
+
+BATCH_SIZE = 1000
+BATCHES_PER_TRANSACTION = 10
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = ['title', 'description', 'domain', 'locationType', 'duration', 'applicationDeadline']
+# Input field -> Internship column for every free-text field, checked for type and column length
+TEXT_FIELDS = {
+    'title': 'title', 'description': 'description', 'domain': 'domain', 'locationType': 'location_type',
+    'duration': 'duration', 'city': 'city', 'country': 'country',
+}
+
+class DecodedLines:
+    """Decodes an iterable of byte lines as strict UTF-8, one line per next().
+
+    A bad line raises UnicodeDecodeError from that next() call only, so the
+    readers can report it as a row error and carry on with the following line.
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._lines).decode('utf-8', errors='strict')
+
+def read_ndjson(lines):
+    """Yields (row_number, data, error) for each non-blank line of an NDJSON byte stream."""
+    for row_number, line in enumerate(lines, start=1):
+        try:
+            line = line.decode('utf-8', errors='strict')
+        except UnicodeDecodeError as e:
+            yield row_number, None, f"Invalid UTF-8: {e}"
+            continue
+        if not line.strip(): continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+def read_csv(lines):
+    """Yields (row_number, data, error) for each row of a CSV byte stream with a header line."""
+    reader = csv.DictReader(DecodedLines(lines))
+    row_number = 0
+    while True:
+        row_number += 1
+        try:
+            data = next(reader)
+        except StopIteration:
+            return
+        # The reader starts afresh on the next line after either error
+        except UnicodeDecodeError as e:
+            yield row_number, None, f"Invalid UTF-8: {e}"
+            continue
+        except csv.Error as e:
+            yield row_number, None, f"Invalid CSV: {e}"
+            continue
+        yield row_number, data, None
+
+def parse_stipend(value):
+    """Returns the stipend as an int, or raises ValueError for anything but a whole number."""
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, float):
+        if not value.is_integer(): raise ValueError(value)
+        return int(value)
+    if isinstance(value, (int, str)):
+        return int(value)
+    raise ValueError(value)
+
+def validate_row(data, company_id, company_name):
+    """Checks one input row and returns (column_values, error_message)."""
+    missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    for field, column in TEXT_FIELDS.items():
+        value = data.get(field)
+        if value is None: continue
+        if not isinstance(value, str):
+            return None, f"{field} must be a string"
+        max_length = Internship.__table__.c[column].type.length
+        if max_length and len(value) > max_length:
+            return None, f"{field} must be at most {max_length} characters"
+    try:
+        deadline = datetime.datetime.strptime(data['applicationDeadline'], '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return None, "Invalid date format for applicationDeadline. Use YYYY-MM-DD."
+    try:
+        stipend = data.get('stipendAmount')
+        stipend_amount = parse_stipend(stipend) if stipend not in (None, '') else None
+    except ValueError:
+        return None, "stipendAmount must be a whole number"
+
+    return {
+        'title': data['title'], 'description': data['description'], 'domain': data['domain'],
+        'company_name': company_name, 'company_id': company_id, 'location_type': data['locationType'],
+        'city': data.get('city') or None, 'country': data.get('country') or None, 'duration': data['duration'],
+        'stipend_amount': stipend_amount, 'application_deadline': deadline,
+    }, None
+
+def import_internships(rows, company_id, company_name, batch_size=BATCH_SIZE):
+    """Validates and inserts rows from read_ndjson/read_csv for one company.
+
+    Valid rows are written with one executemany INSERT per batch and a commit
+    every BATCHES_PER_TRANSACTION batches, so the input is never held in
+    memory. Returns a summary dict with per-row errors for rejected rows.
+    """
+    inserted, failed, errors = 0, 0, []
+    batch, batches_in_transaction = [], 0
+
+    def flush():
+        nonlocal inserted, batch, batches_in_transaction
+        db.session.execute(db.insert(Internship), batch)
+        inserted += len(batch)
+        batch = []
+        batches_in_transaction += 1
+        if batches_in_transaction >= BATCHES_PER_TRANSACTION:
+            commit()
+
+    def commit():
+        nonlocal batches_in_transaction
+        # Invalidate cached listings in the same transaction that adds the rows
+        if batches_in_transaction: TableVersion.bump('internship')
+        db.session.commit()
+        batches_in_transaction = 0
+
+    for row_number, data, error in rows:
+        values = None
+        if not error:
+            values, error = validate_row(data, company_id, company_name)
+        if error:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": error})
+            continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    commit()
+    return {"inserted": inserted, "failed": failed, "errors": errors}
@@ -0,0 +1,53 @@
+import time
+
+import click
+from flask import current_app
+
+from bulk_import import import_internships, read_csv, read_ndjson
+from extensions import db
+from models import User, upgrade_schema
+from recommendations import SkillIndex
+from search import create_search_index
+
+# --- CLI Command Registration Function ---
+def register_commands(app):
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db_command():
+        """Create missing tables and add the constraints and indexes that existing ones predate."""
+        db.create_all()
+        upgrade_schema()
+        create_search_index()
+        click.echo("Database schema is up to date.")
+
+    @app.cli.command('import-internships')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--company-id', required=True, help="Firebase UID of the company account that owns the postings.")
+    @click.option('--format', 'file_format', type=click.Choice(['ndjson', 'csv']), help="Defaults to the file extension.")
+    @click.option('--batch-size', default=1000, show_default=True, help="Rows per INSERT batch.")
+    def import_internships_command(path, company_id, file_format, batch_size):
+        """Bulk-import internships from an NDJSON or CSV file."""
+        company = User.query.get(company_id)
+        if not company or company.role != 'company':
+            raise click.ClickException(f"No company account with id {company_id}")
+
+        file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        with open(path, 'rb') as lines:
+            rows = read_csv(lines) if file_format == 'csv' else read_ndjson(lines)
+            result = import_internships(rows, company.id, company.name, batch_size=batch_size)
+
+        click.echo(f"Imported {result['inserted']} internships, rejected {result['failed']} rows.")
+        for error in result['errors']:
+            click.echo(f"  row {error['row']}: {error['error']}", err=True)
+
+    @app.cli.command('build-skill-index')
+    @click.option('--output', help="Where to write the index. Defaults to SKILL_INDEX_PATH.")
+    def build_skill_index_command(output):
+        """Precompute the recommendation index so workers load it at startup instead of building it."""
+        output = output or current_app.config['SKILL_INDEX_PATH']
+        start = time.perf_counter()
+        index = SkillIndex()
+        index.build()
+        index.save(output)
+        click.echo(f"Indexed {len(index)} internships ({index.nbytes / 2**20:.1f} MiB) "
+                   f"in {time.perf_counter() - start:.1f}s to {output}")
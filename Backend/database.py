@@ -0,0 +1,90 @@
+import contextlib
+import os
+import sqlite3
+import threading
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_DATABASE_URL = "sqlite:///internhub.db"
+
+# Applied to every new SQLite connection. WAL lets readers carry on while one
+# process writes, and busy_timeout makes competing writers wait their turn
+# instead of failing straight away with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    'synchronous': 'NORMAL',
+    'cache_size': os.environ.get('SQLITE_CACHE_SIZE', '-65536'),  # Negative means KiB, so 64 MiB
+}
+
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+_query_recorders = threading.local()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    for statements in getattr(_query_recorders, 'active', ()):
+        statements.append(statement)
+
+@contextlib.contextmanager
+def record_queries():
+    """Collects the SQL statements run on this thread inside the block.
+
+    Test-client requests run on the calling thread, so this can assert how
+    many statements an endpoint issues:
+
+        with record_queries() as statements:
+            client.get('/api/me/saved', headers=headers)
+        assert len(statements) == 1
+    """
+    statements = []
+    active = _query_recorders.__dict__.setdefault('active', [])
+    active.append(statements)
+    try:
+        yield statements
+    finally:
+        active.remove(statements)
+
+def engine_options(url):
+    """Returns the SQLAlchemy engine options for a database URL, with pool settings from the environment."""
+    if url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') != '0',
+    }
+
+def configure_database(app):
+    """Reads DATABASE_URL (and the optional DATABASE_REPLICA_URL) into the app config."""
+    url = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+
+    replica_url = os.environ.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {'replica': {'url': replica_url, **engine_options(replica_url)}}
+
+class RoutingSession(Session):
+    """Sends the reads of GET requests to the 'replica' bind when one is configured.
+
+    Anything flushed still goes to the primary, so a GET that writes keeps working.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and 'replica' in self._db.engines
+                and has_request_context() and request.method in ('GET', 'HEAD')):
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -1,4 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 
+from database import RoutingSession
+
 # Create the extension instance here. It is not yet connected to any app.
-db = SQLAlchemy()
\ No newline at end of file
+# RoutingSession sends GET-request reads to a read replica when one is configured.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
\ No newline at end of file
@@ -0,0 +1,206 @@
+import bisect
+import collections
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('verify_token', 'sql', 'serialization')
+
+class MetricsRegistry:
+    """Per-process request metrics. Each gunicorn worker exposes its own, so scrape every worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = collections.defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum = collections.Counter()
+        self.request_count = collections.Counter()
+        self.phase_seconds = collections.Counter()
+        self.sql_statements = collections.Counter()
+        self.rows_streamed = collections.Counter()
+        self.caches = {}
+
+    def add_cache(self, name, cache):
+        """Reports the hits, misses and hit_ratio of any cache object exposing them."""
+        self.caches[name] = cache
+
+    def observe(self, endpoint, method, status, seconds, phase_seconds, sql_statements, rows_streamed=0):
+        key = (endpoint, method)
+        with self._lock:
+            if rows_streamed:
+                self.rows_streamed[endpoint] += rows_streamed
+            self.bucket_counts[key][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.latency_sum[key] += seconds
+            self.request_count[(endpoint, method, status)] += 1
+            for phase, phase_total in phase_seconds.items():
+                self.phase_seconds[(endpoint, phase)] += phase_total
+            self.sql_statements[endpoint] += sql_statements
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += ['# HELP internhub_request_duration_seconds Request latency by endpoint.',
+                      '# TYPE internhub_request_duration_seconds histogram']
+            for (endpoint, method), counts in sorted(self.bucket_counts.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'internhub_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'internhub_request_duration_seconds_sum{{{labels}}} {self.latency_sum[(endpoint, method)]}')
+                lines.append(f'internhub_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+            lines += ['# HELP internhub_requests_total Requests by endpoint and status code.',
+                      '# TYPE internhub_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.request_count.items()):
+                lines.append(f'internhub_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            lines += ['# HELP internhub_request_phase_seconds_total Time spent in each phase of handling requests.',
+                      '# TYPE internhub_request_phase_seconds_total counter']
+            for (endpoint, phase), seconds in sorted(self.phase_seconds.items()):
+                lines.append(f'internhub_request_phase_seconds_total{{endpoint="{endpoint}",phase="{phase}"}} {seconds}')
+
+            lines += ['# HELP internhub_sql_statements_total SQL statements executed while handling requests.',
+                      '# TYPE internhub_sql_statements_total counter']
+            for endpoint, count in sorted(self.sql_statements.items()):
+                lines.append(f'internhub_sql_statements_total{{endpoint="{endpoint}"}} {count}')
+
+            lines += ['# HELP internhub_streamed_rows_total Rows written by streaming export endpoints.',
+                      '# TYPE internhub_streamed_rows_total counter']
+            for endpoint, count in sorted(self.rows_streamed.items()):
+                lines.append(f'internhub_streamed_rows_total{{endpoint="{endpoint}"}} {count}')
+
+            lines += ['# HELP internhub_cache_requests_total Cache lookups by cache and result.',
+                      '# TYPE internhub_cache_requests_total counter']
+            for name, cache in sorted(self.caches.items()):
+                lines.append(f'internhub_cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}')
+                lines.append(f'internhub_cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}')
+
+            lines += ['# HELP internhub_cache_hit_ratio Share of cache lookups that were hits.',
+                      '# TYPE internhub_cache_hit_ratio gauge']
+            for name, cache in sorted(self.caches.items()):
+                lines.append(f'internhub_cache_hit_ratio{{cache="{name}"}} {cache.hit_ratio}')
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+# cProfile can only be enabled on one thread at a time (Python 3.12+ raises otherwise), so one request is profiled at once
+_profiler_lock = threading.Lock()
+
+def add_phase_time(phase, seconds):
+    if has_request_context() and 'phase_seconds' in g:
+        g.phase_seconds[phase] += seconds
+
+def add_streamed_rows(count):
+    if has_request_context() and 'rows_streamed' in g:
+        g.rows_streamed += count
+
+def timed(phase):
+    """Decorator that adds the wrapped function's run time to the current request's phase totals."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_phase_time(phase, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Counts the time jsonify spends encoding responses as serialization."""
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            add_phase_time('serialization', time.perf_counter() - start)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started_at = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not has_request_context() or 'phase_seconds' not in g:
+        return
+    g.phase_seconds['sql'] += time.perf_counter() - context.metrics_started_at
+    g.sql_statements += 1
+
+def init_metrics(app):
+    """Registers the request timing hooks and the /metrics endpoint.
+
+    Set SLOW_REQUEST_MS to profile requests with cProfile and write a .prof
+    file to PROFILE_DIR for each one slower than the threshold.
+    PROFILE_SAMPLE_RATE (0 to 1) limits how many requests are profiled.
+    """
+    slow_request_seconds = float(os.environ.get('SLOW_REQUEST_MS', 0)) / 1000
+    profile_sample_rate = float(os.environ.get('PROFILE_SAMPLE_RATE', 1))
+    profile_dir = os.environ.get('PROFILE_DIR', 'profiles')
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+        g.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        g.sql_statements = 0
+        g.rows_streamed = 0
+        g.profiler = None
+        if slow_request_seconds and random.random() < profile_sample_rate and _profiler_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            try:
+                g.profiler.enable()
+            except ValueError:  # Another profiling tool, such as a debugger, already owns the hook
+                g.profiler = None
+                _profiler_lock.release()
+
+    @app.after_request
+    def record_request(response):
+        if 'request_started_at' not in g:
+            return response
+        observe = functools.partial(observe_request, g._get_current_object(), request.endpoint or 'unmatched',
+                                    request.method, response.status_code)
+        if response.is_streamed:
+            # A streamed body is generated after this hook, so its SQL and rows are only known once it closes
+            response.call_on_close(observe)
+        else:
+            observe()
+        return response
+
+    def observe_request(request_globals, endpoint, method, status):
+        elapsed = time.perf_counter() - request_globals.request_started_at
+        registry.observe(endpoint, method, status, elapsed, request_globals.phase_seconds,
+                         request_globals.sql_statements, request_globals.rows_streamed)
+
+    @app.teardown_request
+    def stop_profiler(exception):
+        # Teardown runs even when the view raises, so the profiler is never left enabled
+        profiler = g.pop('profiler', None)
+        if not profiler:
+            return
+        profiler.disable()
+        _profiler_lock.release()
+        elapsed = time.perf_counter() - g.request_started_at
+        if elapsed >= slow_request_seconds:
+            os.makedirs(profile_dir, exist_ok=True)
+            endpoint = request.endpoint or 'unmatched'
+            path = os.path.join(profile_dir, f"{endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms.prof")
+            profiler.dump_stats(path)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
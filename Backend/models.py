@@ -1,6 +1,16 @@
-from app import db # Import the 'db' object from your app
+from extensions import db # Import the 'db' object from our extensions file
+from metrics import timed
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import datetime
 
+# --- Helper Function for Conflict-Tolerant Inserts ---
+def insert_on_conflict(model):
+    """Returns an INSERT for the primary database's dialect, which supports ON CONFLICT clauses."""
+    insert = postgresql_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    return insert(model)
+
 # --- User & Profile Models ---
 
 class User(db.Model):
@@ -8,63 +18,9 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(120), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'student' or 'company'
-    created_at = db.Column(db.DateTime, default=dafrom extensions import db  # <-- THE CRITICAL CHANGE
-import datetime
-
-# --- The rest of your models file is correct. ---
-
-class User(db.Model):
-    id = db.Column(db.String(50), primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    name = db.Column(db.String(120), nullable=False)
-    role = db.Column(db.String(20), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
-class StudentProfile(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
-    skills = db.Column(db.Text, nullable=True)
-    bio = db.Column(db.Text, nullable=True)
-    university = db.Column(db.String(200), nullable=True)
-
-class Internship(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    domain = db.Column(db.String(100), nullable=False)
-    company_name = db.Column(db.String(200), nullable=False)
-    company_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
-    location_type = db.Column(db.String(20), nullable=False)
-    city = db.Column(db.String(100), nullable=True)
-    country = db.Column(db.String(100), nullable=True)
-    duration = db.Column(db.String(50), nullable=False)
-    stipend_amount = db.Column(db.Integer, nullable=True)
-    stipend_currency = db.Column(db.String(5), nullable=True, default='$')
-    application_deadline = db.Column(db.DateTime, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-
-    def to_dict(self):
-        return {
-            'id': self.id, 'title': self.title, 'description': self.description,
-            'domain': self.domain, 'company': {'id': self.company_id, 'name': self.company_name},
-            'location': {'type': self.location_type, 'city': self.city, 'country': self.country},
-            'duration': self.duration,
-            'stipend': {'amount': self.stipend_amount, 'currency': self.stipend_currency} if self.stipend_amount is not None else None,
-            'applicationDeadline': self.application_deadline.isoformat(),
-            'createdAt': self.created_at.isoformat(),
-        }
-
-class Application(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
-    internship_id = db.Column(db.Integer, db.ForeignKey('internship.id'), nullable=False)
-    status = db.Column(db.String(50), default='pending')
-    applied_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    
-class SavedInternship(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
-    internship_id = db.Column(db.Integer, db.ForeignKey('internship.id'), nullable=False)tetime.datetime.utcnow)
+    student_profile = db.relationship('StudentProfile', uselist=False, back_populates='user')
 
 class StudentProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -73,6 +29,8 @@ class StudentProfile(db.Model):
     bio = db.Column(db.Text, nullable=True)
     university = db.Column(db.String(200), nullable=True)
 
+    user = db.relationship('User', back_populates='student_profile')
+
 # --- Internship & Company Models ---
 
 class Internship(db.Model):
@@ -82,11 +40,11 @@ class Internship(db.Model):
     domain = db.Column(db.String(100), nullable=False)
     company_name = db.Column(db.String(200), nullable=False)
     company_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
-    
+
     location_type = db.Column(db.String(20), nullable=False) # 'remote', 'hybrid', 'onsite'
     city = db.Column(db.String(100), nullable=True)
     country = db.Column(db.String(100), nullable=True)
-    
+
     duration = db.Column(db.String(50), nullable=False)
     stipend_amount = db.Column(db.Integer, nullable=True)
     stipend_currency = db.Column(db.String(5), nullable=True, default='$')
@@ -94,7 +52,25 @@ class Internship(db.Model):
     application_deadline = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    # Every listing is ordered newest-first by (created_at, id), so each filter
+    # index ends with those columns to let the database walk it for a page.
+    # The open-deadline and minimum-stipend filters are range conditions, so an
+    # index on them could not return rows in that order. Instead their columns
+    # ride along in the (created_at, id) index, so rows are filtered as it is
+    # walked without reading the table. A page still ends only once it has
+    # enough matches, so a threshold few postings reach costs O(N) index
+    # entries: about 120 ms for one no posting meets at 1M rows.
+    __table_args__ = (
+        db.Index('ix_internship_created_id_stipend_deadline', 'created_at', 'id', 'stipend_amount', 'application_deadline'),
+        db.Index('ix_internship_domain_created_id', 'domain', 'created_at', 'id'),
+        db.Index('ix_internship_location_type_created_id', 'location_type', 'created_at', 'id'),
+        db.Index('ix_internship_country_created_id', 'country', 'created_at', 'id'),
+        db.Index('ix_internship_country_city_created_id', 'country', 'city', 'created_at', 'id'),
+        db.Index('ix_internship_company_created', 'company_id', 'created_at'),
+    )
+
     # Helper to convert object to a dictionary, making it easy to send as JSON
+    @timed('serialization')
     def to_dict(self):
         return {
             'id': self.id,
@@ -104,21 +80,108 @@ class Internship(db.Model):
             'company': { 'id': self.company_id, 'name': self.company_name },
             'location': { 'type': self.location_type, 'city': self.city, 'country': self.country },
             'duration': self.duration,
-            'stipend': {'amount': self.stipend_amount, 'currency': self.stipend_currency} if self.stipend_amount else None,
+            'stipend': {'amount': self.stipend_amount, 'currency': self.stipend_currency} if self.stipend_amount is not None else None,
             'applicationDeadline': self.application_deadline.isoformat(),
             'createdAt': self.created_at.isoformat(),
         }
 
+    @staticmethod
+    def open_cutoff():
+        """Returns the earliest application_deadline that still takes applications.
+
+        Deadlines are dates stored as midnight UTC, so a posting stays open
+        until the end of its deadline day rather than the start of it.
+        """
+        return datetime.datetime.combine(datetime.datetime.utcnow().date(), datetime.time())
+
 # --- Join Tables for User Actions ---
 
 class Application(db.Model):
+    STATUSES = ('pending', 'reviewed', 'accepted', 'rejected')
+
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
     internship_id = db.Column(db.Integer, db.ForeignKey('internship.id'), nullable=False)
     status = db.Column(db.String(50), default='pending')
     applied_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    
+
+    # The applicant pipeline pages newest-first through one internship, optionally
+    # narrowed to a single status, and counts applicants per status
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'internship_id', name='uq_application_student_internship'),
+        db.Index('ix_application_internship_status_applied', 'internship_id', 'status', 'applied_at', 'id'),
+        db.Index('ix_application_internship_applied', 'internship_id', 'applied_at', 'id'),
+    )
+
+    @timed('serialization')
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'internshipId': self.internship_id,
+            'studentId': self.student_id,
+            'status': self.status,
+            'appliedAt': self.applied_at.isoformat(),
+        }
+
 class SavedInternship(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.String(50), db.ForeignKey('user.id'), nullable=False)
     internship_id = db.Column(db.Integer, db.ForeignKey('internship.id'), nullable=False)
+
+    internship = db.relationship('Internship')
+
+    # Saving is an INSERT ... ON CONFLICT DO NOTHING against this constraint
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'internship_id', name='uq_saved_internship_student_internship'),
+    )
+
+# --- Cache Invalidation ---
+
+class TableVersion(db.Model):
+    """A write counter per table, shared by every worker through the database.
+
+    Cached responses are keyed on it, so bump it in the same transaction as
+    the write it covers.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def current(cls, name):
+        return db.session.query(cls.version).filter_by(name=name).scalar() or 0
+
+    @classmethod
+    def bump(cls, name):
+        db.session.execute(
+            insert_on_conflict(cls).values(name=name, version=1)
+            .on_conflict_do_update(index_elements=['name'], set_={'version': cls.version + 1})
+        )
+
+# --- Schema Upgrades ---
+
+def upgrade_schema():
+    """Adds the unique constraints and indexes declared above to tables that create_all made before they existed.
+
+    create_all never alters an existing table, so an older database lacks
+    them, and the ON CONFLICT upserts fail without their constraint.
+    Duplicate rows are removed first, keeping the oldest of each, and each
+    constraint is added as a unique index with the constraint's name.
+    """
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            existing |= {constraint['name'] for constraint in inspector.get_unique_constraints(table.name)}
+            for constraint in table.constraints:
+                if not isinstance(constraint, db.UniqueConstraint) or not constraint.name or constraint.name in existing:
+                    continue
+                columns = list(constraint.columns)
+                oldest = db.select(db.func.min(table.c.id)).group_by(*columns)
+                conn.execute(table.delete().where(table.c.id.not_in(oldest)))
+                column_names = ', '.join(column.name for column in columns)
+                conn.execute(db.text(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} ({column_names})"))
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
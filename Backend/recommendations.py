@@ -0,0 +1,296 @@
+import array
+import collections
+import datetime
+import itertools
+import math
+import os
+import re
+import threading
+
+import numpy as np
+
+from models import db, Internship
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# Postings added since the last build are kept in dicts until there are this many, then merged into the arrays
+DELTA_MERGE_SIZE = 5000
+# Deadlines are compared as whole seconds since the epoch
+EPOCH = datetime.datetime(1970, 1, 1)
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+def term_weights(title, description, domain):
+    """Returns {term: normalised term frequency} for one posting."""
+    # Title and domain say more about the role than the description, so count them twice
+    terms = collections.Counter(tokenize(description))
+    terms.update(tokenize(title) * 2)
+    terms.update(tokenize(domain) * 2)
+    total = sum(terms.values()) or 1
+    return {term: count / total for term, count in terms.items()}
+
+def deadline_seconds(application_deadline):
+    return int((application_deadline - EPOCH).total_seconds())
+
+class _Segment:
+    """An immutable, array-backed inverted index over a fixed set of postings.
+
+    Posting lists are stored CSR-style: the documents and weights of term t
+    are doc_rows[offsets[t]:offsets[t + 1]] and weights[...], where a doc row
+    indexes into ids and deadlines.
+    """
+
+    def __init__(self, terms, offsets, doc_rows, weights, ids, deadlines):
+        self.terms = terms
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_rows = doc_rows
+        self.weights = weights
+        self.ids = ids
+        self.deadlines = deadlines
+        self.max_id = int(ids.max()) if len(ids) else 0
+
+    @classmethod
+    def empty(cls):
+        return cls([], np.zeros(1, np.int64), np.zeros(0, np.int32), np.zeros(0, np.float32),
+                   np.zeros(0, np.int64), np.zeros(0, np.int64))
+
+    @classmethod
+    def from_postings(cls, terms, term_rows, doc_rows, weights, ids, deadlines):
+        """Builds a segment from unsorted (term row, doc row, weight) triples."""
+        order = np.argsort(term_rows, kind='stable')
+        offsets = np.zeros(len(terms) + 1, np.int64)
+        np.cumsum(np.bincount(term_rows, minlength=len(terms)), out=offsets[1:])
+        return cls(terms, offsets, doc_rows[order].astype(np.int32, copy=False),
+                   weights[order].astype(np.float32, copy=False),
+                   ids.astype(np.int64, copy=False), deadlines.astype(np.int64, copy=False))
+
+    @classmethod
+    def from_documents(cls, documents, base=None):
+        """Builds a segment from (internship_id, {term: weight}, deadline_seconds) tuples, appended to base if given."""
+        terms = list(base.terms) if base is not None else []
+        vocabulary = dict(base.vocabulary) if base is not None else {}
+        # array.array keeps the intermediate triples as packed C values rather than Python objects
+        term_rows, doc_rows, weights = array.array('i'), array.array('i'), array.array('f')
+        ids, deadlines = array.array('q'), array.array('q')
+        first_row = len(base.ids) if base is not None else 0
+        def term_row(term):
+            row = vocabulary.get(term)
+            if row is None:
+                row = vocabulary[term] = len(terms)
+                terms.append(term)
+            return row
+
+        for doc_row, (internship_id, weighted_terms, deadline) in enumerate(documents, start=first_row):
+            ids.append(internship_id)
+            deadlines.append(deadline)
+            term_rows.extend(map(term_row, weighted_terms))
+            doc_rows.extend(itertools.repeat(doc_row, len(weighted_terms)))
+            weights.extend(weighted_terms.values())
+
+        term_rows = np.frombuffer(term_rows, np.int32) if term_rows else np.zeros(0, np.int32)
+        doc_rows = np.frombuffer(doc_rows, np.int32) if doc_rows else np.zeros(0, np.int32)
+        weights = np.frombuffer(weights, np.float32) if weights else np.zeros(0, np.float32)
+        ids = np.frombuffer(ids, np.int64) if ids else np.zeros(0, np.int64)
+        deadlines = np.frombuffer(deadlines, np.int64) if deadlines else np.zeros(0, np.int64)
+        if base is not None:
+            base_term_rows = np.repeat(np.arange(len(base.terms), dtype=np.int32), np.diff(base.offsets))
+            term_rows = np.concatenate([base_term_rows, term_rows])
+            doc_rows = np.concatenate([base.doc_rows, doc_rows])
+            weights = np.concatenate([base.weights, weights])
+            ids = np.concatenate([base.ids, ids])
+            deadlines = np.concatenate([base.deadlines, deadlines])
+        return cls.from_postings(terms, term_rows, doc_rows, weights, ids, deadlines)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.offsets, self.doc_rows, self.weights, self.ids, self.deadlines))
+
+    def save(self, path):
+        np.savez(path, terms=np.array(self.terms, dtype=str), offsets=self.offsets, doc_rows=self.doc_rows,
+                 weights=self.weights, ids=self.ids, deadlines=self.deadlines)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['terms'].tolist(), data['offsets'], data['doc_rows'], data['weights'],
+                       data['ids'], data['deadlines'])
+
+class SkillIndex:
+    """An in-memory inverted index of internship text, used to rank postings against student skills.
+
+    The bulk of the index is a _Segment of numpy arrays, built once by
+    build() or load(). Postings added afterwards go to a small dict-based
+    delta that is merged into a new segment every DELTA_MERGE_SIZE postings.
+    A query adds idf * weight over the posting lists of the student's own
+    skill terms with vectorised numpy operations and picks the top k with
+    argpartition, so no posting is scored one by one in Python.
+    """
+
+    def __init__(self):
+        self._segment = None
+        self._delta_postings = collections.defaultdict(dict)
+        self._delta_deadlines = {}
+        self._max_id = 0
+        self._lock = threading.Lock()
+        self._merge_lock = threading.Lock()
+        self._warmup = None
+
+    def __len__(self):
+        with self._lock:
+            return (len(self._segment.ids) if self._segment else 0) + len(self._delta_deadlines)
+
+    @property
+    def ready(self):
+        return self._segment is not None
+
+    @property
+    def nbytes(self):
+        return self._segment.nbytes if self._segment else 0
+
+    def build(self, rows=None):
+        """Builds the index from (id, title, description, domain, deadline) rows, read from the database by default."""
+        if rows is None:
+            rows = (
+                db.session.query(Internship.id, Internship.title, Internship.description,
+                                 Internship.domain, Internship.application_deadline)
+                .order_by(Internship.id)
+                .yield_per(5000)
+            )
+        segment = _Segment.from_documents(
+            (row[0], term_weights(row[1], row[2], row[3]), deadline_seconds(row[4])) for row in rows
+        )
+        self._install(segment)
+
+    def load(self, path):
+        self._install(_Segment.load(path))
+
+    def save(self, path):
+        self._merge(force=True)
+        self._segment.save(path)
+
+    def _install(self, segment, merged_ids=None):
+        with self._lock:
+            self._segment = segment
+            # Drop the delta postings the new segment now covers
+            if merged_ids is None:
+                merged_ids = {i for i in self._delta_deadlines if i <= segment.max_id}
+            for term in list(self._delta_postings):
+                postings = self._delta_postings[term]
+                for internship_id in merged_ids & postings.keys():
+                    del postings[internship_id]
+                if not postings: del self._delta_postings[term]
+            for internship_id in merged_ids:
+                self._delta_deadlines.pop(internship_id, None)
+            self._max_id = max(self._max_id, segment.max_id)
+
+    def add(self, internship_id, title, description, domain, application_deadline):
+        weighted_terms = term_weights(title, description, domain)
+        deadline = deadline_seconds(application_deadline)
+        with self._lock:
+            if self._segment and internship_id <= self._segment.max_id:
+                return
+            for term, weight in weighted_terms.items():
+                self._delta_postings[term][internship_id] = weight
+            self._delta_deadlines[internship_id] = deadline
+            # Until the first build there is nothing to merge into
+            merge_due = self._segment is not None and len(self._delta_deadlines) >= DELTA_MERGE_SIZE
+        if merge_due:
+            self._merge()
+
+    def _merge(self, force=False):
+        """Folds the delta into a new segment without blocking queries while the arrays are rebuilt."""
+        if not self._merge_lock.acquire(blocking=force):
+            return
+        try:
+            with self._lock:
+                base = self._segment
+                documents = {internship_id: {} for internship_id in self._delta_deadlines}
+                for term, postings in self._delta_postings.items():
+                    for internship_id, weight in postings.items():
+                        documents[internship_id][term] = weight
+                documents = [(i, documents[i], self._delta_deadlines[i]) for i in sorted(documents)]
+            self._install(_Segment.from_documents(documents, base=base), merged_ids={i for i, _, _ in documents})
+        finally:
+            self._merge_lock.release()
+
+    def refresh(self):
+        """Indexes any internships past the last refresh, including those posted by other workers.
+
+        Re-adding a row that add() already indexed is harmless, so the id
+        watermark only ever moves here. Rows are read without holding the
+        index lock, so queries keep being answered meanwhile.
+        """
+        rows = (
+            db.session.query(Internship.id, Internship.title, Internship.description,
+                             Internship.domain, Internship.application_deadline)
+            .filter(Internship.id > self._max_id)
+            .order_by(Internship.id)
+            .yield_per(5000)
+        )
+        for row in rows:
+            self.add(*row)
+            with self._lock:
+                self._max_id = max(self._max_id, row.id)
+
+    def start_warmup(self, app, path=None):
+        """Loads the index from path (or builds it from the database) on a background thread, once."""
+        with self._lock:
+            if self._warmup and self._warmup.is_alive():
+                return self._warmup
+
+            def warm():
+                try:
+                    with app.app_context():
+                        if path and os.path.exists(path):
+                            self.load(path)
+                        else:
+                            self.build()
+                        self.refresh()
+                except Exception as e:
+                    print(f"Warning: Could not build the skill index: {e}")
+
+            self._warmup = threading.Thread(target=warm, name='skill-index-warmup', daemon=True)
+            self._warmup.start()
+            return self._warmup
+
+    def recommend(self, skills, k, cutoff=None):
+        """Returns up to k (internship_id, score) pairs for open internships, best match first.
+
+        Postings with a deadline before cutoff (by default Internship.open_cutoff()) are left out.
+        """
+        query_terms = set(tokenize(skills))
+        cutoff = deadline_seconds(cutoff or Internship.open_cutoff())
+        with self._lock:
+            segment = self._segment or _Segment.empty()
+            total = len(segment.ids) + len(self._delta_deadlines)
+            scores = np.zeros(len(segment.ids), np.float32)
+            delta_scores = collections.Counter()
+            for term in query_terms:
+                term_row = segment.vocabulary.get(term)
+                start, end = (segment.offsets[term_row], segment.offsets[term_row + 1]) if term_row is not None else (0, 0)
+                delta_postings = self._delta_postings.get(term, {})
+                document_frequency = end - start + len(delta_postings)
+                if not document_frequency: continue
+                idf = math.log(1 + total / document_frequency)
+                # Each document appears once per posting list, so plain fancy-indexed addition is safe
+                scores[segment.doc_rows[start:end]] += np.float32(idf) * segment.weights[start:end]
+                for internship_id, weight in delta_postings.items():
+                    delta_scores[internship_id] += idf * weight
+            delta_candidates = [(internship_id, score) for internship_id, score in delta_scores.items()
+                                if self._delta_deadlines[internship_id] >= cutoff]
+
+        scores[segment.deadlines < cutoff] = 0
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        candidates = [(int(internship_id), float(score))
+                      for internship_id, score in zip(segment.ids[matched], scores[matched])]
+        candidates += delta_candidates
+        # Ties go to the newer posting, matching the previous heap-based selection
+        candidates.sort(key=lambda candidate: (candidate[1], candidate[0]), reverse=True)
+        return candidates[:k]
+
+# One index per worker process; refresh() keeps it current with the shared database
+skill_index = SkillIndex()
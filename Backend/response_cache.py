@@ -0,0 +1,133 @@
+import collections
+import functools
+import hashlib
+import json
+import threading
+import time
+
+from flask import make_response, request
+
+from models import TableVersion
+
+# Browsers and proxies may store responses but must revalidate them with the ETag on every use
+CACHE_CONTROL = 'public, no-cache'
+DEFAULT_TTL_SECONDS = 300
+
+class MemoryCacheBackend:
+    """A per-process LRU store. Each gunicorn worker keeps its own copy of the responses."""
+
+    def __init__(self, max_entries=1024, ttl=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry: return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class RedisCacheBackend:
+    """Shares cached responses across workers through any Redis-compatible client.
+
+    Eviction is left to the server's own maxmemory policy.
+    """
+
+    def __init__(self, client, ttl=DEFAULT_TTL_SECONDS):
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.client.get(f'response:{key}')
+
+    def set(self, key, value):
+        self.client.set(f'response:{key}', value, ex=self.ttl)
+
+class ResponseCache:
+    """Caches successful JSON responses keyed by URL and the table's TableVersion row.
+
+    The version is read from the database on the same bind as the view's own
+    query, so every worker sees a write as soon as that bind does, and a
+    lagging replica can only ever pin its rows under the version it had.
+    ETags are a digest of the body, so a 304 is only sent for identical bytes.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        # Worker threads serve requests concurrently, so the counters are only updated under this
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def cached(self, table, time_dependent_args=()):
+        """Decorator for public GET views whose response only depends on the URL and the table's rows.
+
+        Requests using any of time_dependent_args (e.g. '?open=true', which
+        changes as deadlines pass) are rendered fresh every time.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if any(arg in request.args for arg in time_dependent_args):
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    return self._finish(response, self._etag(response.get_data()), 'BYPASS')
+
+                key = f"{table}:{TableVersion.current(table)}:{request.full_path}"
+                entry = self.backend.get(key)
+                if entry is not None:
+                    with self._lock:
+                        self.hits += 1
+                    entry = json.loads(entry)
+                    response = make_response(entry['body'], 200, entry['headers'])
+                    response.mimetype = 'application/json'
+                    return self._finish(response, entry['etag'], 'HIT')
+
+                with self._lock:
+                    self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                etag = self._etag(response.get_data())
+                headers = {name: value for name, value in response.headers.items() if name.startswith('X-')}
+                self.backend.set(key, json.dumps({'body': response.get_data(as_text=True), 'headers': headers, 'etag': etag}))
+                return self._finish(response, etag, 'MISS')
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _etag(body):
+        return hashlib.sha256(body).hexdigest()
+
+    @staticmethod
+    def _finish(response, etag, status):
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        response.headers['X-Cache'] = status
+        # The ETag is checked only once the body is known, so a 304 always matches current data
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304, {'ETag': response.headers['ETag'], 'Cache-Control': CACHE_CONTROL, 'X-Cache': status})
+        return response
+
+# Swapped for a RedisCacheBackend in create_app when RESPONSE_CACHE_URL is set
+response_cache = ResponseCache(MemoryCacheBackend())
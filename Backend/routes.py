@@ -1,9 +1,28 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
+from bulk_import import import_internships, read_csv, read_ndjson
 from firebase_admin import auth
-from models import db, User, Internship, StudentProfile, SavedInternship, Application 
+from metrics import timed
+from sqlalchemy.exc import IntegrityError
+from models import db, insert_on_conflict, User, Internship, StudentProfile, SavedInternship, Application, TableVersion
+from recommendations import skill_index
+from response_cache import response_cache
+from search import internship_search_query, render_highlight
+from serializers import InternshipProjection, dumps, json_response, ndjson_response
+from tasks import task_queue
+from token_cache import TokenCache
+import base64
 import datetime
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_BULK_STATUS_UPDATE = 5000
+EXPORT_BATCH_SIZE = 1000
+
+# Verified tokens are reused until they expire, so signature checks only run once per token
+token_cache = TokenCache(lambda id_token: auth.verify_id_token(id_token))
+
 # --- Helper Function to Verify Firebase Token ---
+@timed('verify_token')
 def verify_token(request):
     """Helper function to verify Firebase ID token and return (uid, error_tuple)."""
     auth_header = request.headers.get('Authorization')
@@ -12,11 +31,99 @@ def verify_token(request):
     
     try:
         id_token = auth_header.split('Bearer ')[1]
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = token_cache.verify(id_token)
         return decoded_token['uid'], None
     except Exception as e:
         return None, (jsonify({"error": f"Token verification failed: {e}"}), 403)
 
+# --- Helper Function to Check Internship Ownership ---
+def get_owned_internship(uid, internship_id):
+    """Helper function to load an internship the company user owns and return (internship, error_tuple)."""
+    internship = Internship.query.get(internship_id)
+    if not internship:
+        return None, (jsonify({"error": "Internship not found"}), 404)
+    if internship.company_id != uid:
+        return None, (jsonify({"error": "Forbidden: You can only manage your own internships."}), 403)
+    return internship, None
+
+# --- Helper Functions for Paginated Listings ---
+def encode_cursor(timestamp, row_id):
+    """Encodes a (timestamp, id) keyset position as an opaque cursor."""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decodes a cursor from encode_cursor back into a (timestamp, id) tuple."""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, row_id = raw.split('|')
+    return datetime.datetime.fromisoformat(timestamp), int(row_id)
+
+def paginate(query, args, timestamp_column, id_column, position):
+    """Returns one newest-first keyset page of the query as (rows, next_cursor, error_tuple).
+
+    position(row) must give the row's (timestamp, id) so the next cursor can be built.
+    """
+    limit, error = parse_limit(args)
+    if error: return None, None, error
+
+    if args.get('cursor'):
+        try:
+            timestamp, row_id = decode_cursor(args['cursor'])
+        except (ValueError, UnicodeDecodeError):
+            return None, None, (jsonify({"error": "Invalid cursor"}), 400)
+        query = query.filter(db.tuple_(timestamp_column, id_column) < db.tuple_(timestamp, row_id))
+
+    # Fetch one extra row so we know whether another page exists
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(*position(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor, None
+
+# --- Helper Functions for Internship Listings ---
+def filter_internships(query, args):
+    """Applies the listing filters from the query string and returns (query, error_tuple)."""
+    if args.get('domain'):
+        query = query.filter(Internship.domain == args['domain'])
+    if args.get('locationType'):
+        query = query.filter(Internship.location_type == args['locationType'])
+    if args.get('country'):
+        query = query.filter(Internship.country == args['country'])
+    if args.get('city'):
+        query = query.filter(Internship.city == args['city'])
+    if args.get('minStipend'):
+        try:
+            query = query.filter(Internship.stipend_amount >= int(args['minStipend']))
+        except ValueError:
+            return None, (jsonify({"error": "minStipend must be an integer"}), 400)
+    if args.get('open', '').lower() in ('1', 'true'):
+        query = query.filter(Internship.application_deadline >= Internship.open_cutoff())
+    return query, None
+
+def paginate_internships(query, args):
+    """Returns one newest-first page of internship rows as (rows, next_cursor, error_tuple)."""
+    return paginate(query, args, Internship.created_at, Internship.id, lambda i: (i.created_at, i.id))
+
+def parse_limit(args):
+    """Reads the page size from the query string and returns (limit, error_tuple)."""
+    try:
+        return min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE), None
+    except ValueError:
+        return None, (jsonify({"error": "limit must be an integer"}), 400)
+
+def parse_since(args):
+    """Reads the optional ISO 8601 'since' timestamp for incremental exports and returns (since, error_tuple).
+
+    Timestamps are stored as naive UTC, so one with an offset is converted to UTC first.
+    """
+    if not args.get('since'):
+        return None, None
+    try:
+        since = datetime.datetime.fromisoformat(args['since'])
+    except ValueError:
+        return None, (jsonify({"error": "since must be an ISO 8601 timestamp"}), 400)
+    if since.tzinfo is not None:
+        since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return since, None
+
 # --- Main Route Registration Function ---
 def register_routes(app, db):
 
@@ -44,7 +151,8 @@ def register_routes(app, db):
         uid, error = verify_token(request)
         if error: return error
 
-        user = User.query.get(uid)
+        # Load the user and their student profile in a single joined query
+        user = User.query.options(db.joinedload(User.student_profile)).filter_by(id=uid).first()
         if not user:
             return jsonify({"error": "User not found in database"}), 404
         
@@ -53,12 +161,8 @@ def register_routes(app, db):
              # For company users, just return their basic info for now
              return jsonify({"name": user.name, "email": user.email, "role": user.role})
 
-        # Find or create the student's profile to avoid errors
-        student_profile = StudentProfile.query.filter_by(user_id=uid).first()
-        if not student_profile:
-            student_profile = StudentProfile(user_id=uid)
-            db.session.add(student_profile)
-            db.session.commit()
+        # A missing profile reads as empty and is only stored when the student saves it
+        student_profile = user.student_profile or StudentProfile(user_id=uid)
 
         if request.method == 'GET':
             return jsonify({
@@ -73,27 +177,90 @@ def register_routes(app, db):
             data = request.get_json()
             if not data: return jsonify({"error": "No data provided"}), 400
 
-            if 'name' in data and data['name'] and data['name'] != user.name:
-                user.name = data['name']
-                # Update Firebase displayName to keep things in sync
-                try:
-                    auth.update_user(uid, display_name=f"{data['name']}_{user.role}")
-                except Exception as e:
-                    print(f"Warning: Could not update Firebase display name: {e}")
-
-            if student_profile:
-                if 'university' in data: student_profile.university = data['university']
-                if 'bio' in data: student_profile.bio = data['bio']
-                if 'skills' in data: student_profile.skills = data['skills']
+            name_changed = 'name' in data and data['name'] and data['name'] != user.name
+            if name_changed: user.name = data['name']
+
+            if 'university' in data: student_profile.university = data['university']
+            if 'bio' in data: student_profile.bio = data['bio']
+            if 'skills' in data: student_profile.skills = data['skills']
+            db.session.add(student_profile)
             
             db.session.commit()
-            return jsonify({"message": "Profile updated successfully"})
+            if not name_changed:
+                return jsonify({"message": "Profile updated successfully"})
+
+            # Update Firebase displayName to keep things in sync, in the background so a
+            # slow admin API can't hold up the response
+            task_id = task_queue.submit('sync_display_name', uid, uid, auth.update_user,
+                                        uid, display_name=f"{user.name}_{user.role}")
+            return jsonify({"message": "Profile updated successfully", "syncTaskId": task_id})
+
+    @app.route('/api/me/tasks/<task_id>', methods=['GET'])
+    def get_task_status(task_id):
+        uid, error = verify_token(request)
+        if error: return error
+        task = task_queue.status(task_id)
+        if not task or task['owner'] != uid: return jsonify({"error": "Task not found"}), 404
+        return jsonify(task)
 
     # --- Internship Endpoints ---
     @app.route('/api/internships', methods=['GET'])
+    @response_cache.cached('internship', time_dependent_args=('open',))
     def get_internships():
-        all_internships = Internship.query.order_by(Internship.created_at.desc()).all()
-        return jsonify([i.to_dict() for i in all_internships])
+        # Select plain column tuples rather than ORM objects, optionally narrowed by ?fields=
+        projection, error = InternshipProjection.from_args(request.args)
+        if error: return error
+        query, error = filter_internships(db.session.query(*projection.columns), request.args)
+        if error: return error
+        rows, next_cursor, error = paginate_internships(query, request.args)
+        if error: return error
+        response = json_response([projection.to_dict(row) for row in rows])
+        if next_cursor: response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+    @app.route('/api/internships/search', methods=['GET'])
+    @response_cache.cached('internship', time_dependent_args=('open',))
+    def search_internships():
+        """GET /api/internships/search?q=... with the listing filters, plus highlighted title and description.
+
+        On SQLite, results are ranked by BM25 relevance. On other databases,
+        results are a substring match on title, description, domain and
+        company, ordered newest first rather than by relevance.
+        """
+        q = request.args.get('q', '').strip()
+        if not q: return jsonify({"error": "Missing search query 'q'"}), 400
+        query, error = filter_internships(internship_search_query(q), request.args)
+        if error: return error
+        limit, error = parse_limit(request.args)
+        if error: return error
+        # Results are ranked by relevance rather than recency, so the cursor is a plain offset
+        try:
+            offset = int(base64.urlsafe_b64decode(request.args['cursor'].encode())) if request.args.get('cursor') else 0
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        rows = query.offset(offset).limit(limit + 1).all()
+        response = jsonify([
+            {**internship.to_dict(), 'highlight': {'title': render_highlight(title), 'description': render_highlight(snippet)}}
+            for internship, title, snippet in rows[:limit]
+        ])
+        if len(rows) > limit:
+            response.headers['X-Next-Cursor'] = base64.urlsafe_b64encode(str(offset + limit).encode()).decode()
+        return response
+
+    @app.route('/api/internships/export', methods=['GET'])
+    def export_internships():
+        projection, error = InternshipProjection.from_args(request.args)
+        if error: return error
+        query, error = filter_internships(db.session.query(*projection.columns), request.args)
+        if error: return error
+        since, error = parse_since(request.args)
+        if error: return error
+        if since: query = query.filter(Internship.created_at > since)
+
+        # Oldest first so a partner can resume from the last createdAt it saw
+        rows = query.order_by(Internship.created_at, Internship.id).yield_per(EXPORT_BATCH_SIZE)
+        return ndjson_response(dumps(projection.to_dict(row)) for row in rows)
 
     @app.route('/api/internships', methods=['POST'])
     def post_internship():
@@ -116,44 +283,236 @@ def register_routes(app, db):
             application_deadline=deadline
         )
         db.session.add(new_internship)
+        TableVersion.bump('internship')
         db.session.commit()
+        skill_index.add(new_internship.id, new_internship.title, new_internship.description,
+                        new_internship.domain, new_internship.application_deadline)
         return jsonify(new_internship.to_dict()), 201
     
+    @app.route('/api/internships/bulk', methods=['POST'])
+    def bulk_post_internships():
+        uid, error = verify_token(request)
+        if error: return error
+        user = User.query.get(uid)
+        if not user or user.role != 'company':
+            return jsonify({"error": "Forbidden: Only company accounts can post internships."}), 403
+
+        # Read the body line by line so large uploads never sit in memory whole. The readers
+        # decode each line themselves so a bad one is reported as a row error.
+        lines = request.stream
+        if request.mimetype == 'text/csv':
+            rows = read_csv(lines)
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            rows = read_ndjson(lines)
+        else:
+            return jsonify({"error": "Content-Type must be application/x-ndjson or text/csv"}), 415
+
+        result = import_internships(rows, uid, user.name)
+        return jsonify(result), 201 if result['inserted'] else 400
+
     @app.route('/api/internships/<int:internship_id>', methods=['GET'])
+    @response_cache.cached('internship')
     def get_internship(internship_id):
-        internship = Internship.query.get(internship_id)
-        if internship: return jsonify(internship.to_dict())
+        projection, error = InternshipProjection.from_args(request.args)
+        if error: return error
+        row = db.session.query(*projection.columns).filter(Internship.id == internship_id).first()
+        if row: return json_response(projection.to_dict(row))
         return jsonify({"error": "Internship not found"}), 404
 
+    # --- Recommendation Endpoints ---
+    @app.route('/api/me/recommendations', methods=['GET'])
+    def get_recommendations():
+        uid, error = verify_token(request)
+        if error: return error
+        limit, error = parse_limit(request.args)
+        if error: return error
+        student_profile = StudentProfile.query.filter_by(user_id=uid).first()
+        if not student_profile: return jsonify({"error": "Student profile not found"}), 404
+        if not student_profile.skills: return jsonify([])
+
+        if not skill_index.ready:
+            # The first request for recommendations loads the index in the background, so importing the app
+            # (e.g. for a 'flask' CLI command) never builds it; until then ask the client to come back
+            skill_index.start_warmup(current_app._get_current_object(), current_app.config['SKILL_INDEX_PATH'])
+            response = jsonify({"error": "Recommendations are warming up, try again shortly"})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        skill_index.refresh()
+        ranked = skill_index.recommend(student_profile.skills, limit)
+        if not ranked: return jsonify([])
+        internships = {i.id: i for i in Internship.query.filter(Internship.id.in_([i for i, _ in ranked]))}
+        return jsonify([
+            {**internships[internship_id].to_dict(), 'matchScore': round(score, 4)}
+            for internship_id, score in ranked if internship_id in internships
+        ])
+
     # --- Saved Internship Endpoints ---
     @app.route('/api/me/saved', methods=['GET'])
     def get_saved_internships():
         uid, error = verify_token(request)
         if error: return error
-        saved_relations = SavedInternship.query.filter_by(student_id=uid).all()
-        saved_ids = [s.internship_id for s in saved_relations]
-        if not saved_ids: return jsonify([])
-        internships = Internship.query.filter(Internship.id.in_(saved_ids)).all()
-        return jsonify([i.to_dict() for i in internships])
+        saved = (
+            SavedInternship.query
+            .options(db.joinedload(SavedInternship.internship, innerjoin=True))
+            .filter_by(student_id=uid)
+            .order_by(SavedInternship.id.desc())
+            .all()
+        )
+        return jsonify([s.internship.to_dict() for s in saved])
 
     @app.route('/api/internships/<int:internship_id>/save', methods=['POST'])
     def save_internship(internship_id):
         uid, error = verify_token(request)
         if error: return error
-        if not Internship.query.get(internship_id): return jsonify({"error": "Internship not found"}), 404
-        if SavedInternship.query.filter_by(student_id=uid, internship_id=internship_id).first():
-            return jsonify({"message": "Already saved"}), 200
-        new_save = SavedInternship(student_id=uid, internship_id=internship_id)
-        db.session.add(new_save)
+        # Insert only if the internship exists, and let the unique constraint absorb repeat saves
+        result = db.session.execute(
+            insert_on_conflict(SavedInternship)
+            .from_select(['student_id', 'internship_id'],
+                         db.select(db.literal(uid), Internship.id).where(Internship.id == internship_id))
+            .on_conflict_do_nothing(index_elements=['student_id', 'internship_id'])
+        )
         db.session.commit()
-        return jsonify({"message": "Saved successfully"}), 201
+        if result.rowcount: return jsonify({"message": "Saved successfully"}), 201
+        # Nothing was inserted: tell a missing internship apart from an existing save
+        if not db.session.query(Internship.query.filter_by(id=internship_id).exists()).scalar():
+            return jsonify({"error": "Internship not found"}), 404
+        return jsonify({"message": "Already saved"}), 200
 
     @app.route('/api/internships/<int:internship_id>/save', methods=['DELETE'])
     def unsave_internship(internship_id):
         uid, error = verify_token(request)
         if error: return error
-        save_to_delete = SavedInternship.query.filter_by(student_id=uid, internship_id=internship_id).first()
-        if not save_to_delete: return jsonify({"error": "Not found"}), 404
-        db.session.delete(save_to_delete)
+        deleted = SavedInternship.query.filter_by(student_id=uid, internship_id=internship_id).delete()
         db.session.commit()
+        if not deleted: return jsonify({"error": "Not found"}), 404
         return jsonify({"message": "Unsaved successfully"}), 200
+
+    # --- Application Endpoints ---
+    @app.route('/api/internships/<int:internship_id>/apply', methods=['POST'])
+    def apply_to_internship(internship_id):
+        uid, error = verify_token(request)
+        if error: return error
+        user = User.query.get(uid)
+        if not user or user.role != 'student':
+            return jsonify({"error": "Forbidden: Only student accounts can apply to internships."}), 403
+        internship = Internship.query.get(internship_id)
+        if not internship: return jsonify({"error": "Internship not found"}), 404
+        if internship.application_deadline < Internship.open_cutoff():
+            return jsonify({"error": "The application deadline for this internship has passed"}), 400
+
+        # The unique (student_id, internship_id) constraint catches repeat applications
+        new_application = Application(student_id=uid, internship_id=internship_id)
+        db.session.add(new_application)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"message": "Already applied"}), 200
+        return jsonify(new_application.to_dict()), 201
+
+    @app.route('/api/me/applications', methods=['GET'])
+    def get_my_applications():
+        uid, error = verify_token(request)
+        if error: return error
+        rows = (
+            db.session.query(Application, Internship)
+            .join(Internship, Internship.id == Application.internship_id)
+            .filter(Application.student_id == uid)
+            .order_by(Application.applied_at.desc())
+            .all()
+        )
+        return jsonify([{**application.to_dict(), 'internship': internship.to_dict()} for application, internship in rows])
+
+    @app.route('/api/internships/<int:internship_id>/applications', methods=['GET'])
+    def get_applicants(internship_id):
+        uid, error = verify_token(request)
+        if error: return error
+        internship, error = get_owned_internship(uid, internship_id)
+        if error: return error
+
+        query = (
+            db.session.query(Application, User.name, User.email)
+            .join(User, User.id == Application.student_id)
+            .filter(Application.internship_id == internship_id)
+        )
+        status = request.args.get('status')
+        if status:
+            if status not in Application.STATUSES:
+                return jsonify({"error": f"status must be one of {', '.join(Application.STATUSES)}"}), 400
+            query = query.filter(Application.status == status)
+        rows, next_cursor, error = paginate(query, request.args, Application.applied_at, Application.id,
+                                            lambda row: (row[0].applied_at, row[0].id))
+        if error: return error
+
+        # Answered from the (internship_id, status, ...) index without touching the table
+        counts = dict(
+            db.session.query(Application.status, db.func.count())
+            .filter(Application.internship_id == internship_id)
+            .group_by(Application.status)
+            .all()
+        )
+        response = jsonify({
+            "applicants": [
+                {**application.to_dict(), 'student': {'id': application.student_id, 'name': name, 'email': email}}
+                for application, name, email in rows
+            ],
+            "statusCounts": {s: counts.get(s, 0) for s in Application.STATUSES},
+        })
+        if next_cursor: response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+    @app.route('/api/internships/<int:internship_id>/applications', methods=['PATCH'])
+    def update_applicant_statuses(internship_id):
+        uid, error = verify_token(request)
+        if error: return error
+        internship, error = get_owned_internship(uid, internship_id)
+        if error: return error
+
+        data = request.get_json()
+        if not data: return jsonify({"error": "No data provided"}), 400
+        status = data.get('status')
+        application_ids = data.get('applicationIds')
+        if status not in Application.STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(Application.STATUSES)}"}), 400
+        if (not isinstance(application_ids, list) or not application_ids
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in application_ids)):
+            return jsonify({"error": "applicationIds must be a non-empty list of integers"}), 400
+        if len(application_ids) > MAX_BULK_STATUS_UPDATE:
+            return jsonify({"error": f"At most {MAX_BULK_STATUS_UPDATE} applications can be updated at once"}), 400
+
+        # A single UPDATE, scoped to this internship so other postings' applications can't be touched
+        updated = (
+            Application.query
+            .filter(Application.internship_id == internship_id, Application.id.in_(application_ids))
+            .update({Application.status: status}, synchronize_session=False)
+        )
+        db.session.commit()
+        return jsonify({"message": "Applications updated successfully", "updated": updated})
+
+    @app.route('/api/company/applications/export', methods=['GET'])
+    def export_company_applications():
+        uid, error = verify_token(request)
+        if error: return error
+        user = User.query.get(uid)
+        if not user or user.role != 'company':
+            return jsonify({"error": "Forbidden: Only company accounts can export applications."}), 403
+        since, error = parse_since(request.args)
+        if error: return error
+
+        query = (
+            db.session.query(Application.id, Application.internship_id, Application.student_id,
+                             Application.status, Application.applied_at, User.name, User.email)
+            .join(Internship, Internship.id == Application.internship_id)
+            .join(User, User.id == Application.student_id)
+            .filter(Internship.company_id == uid)
+        )
+        if since: query = query.filter(Application.applied_at > since)
+        rows = query.order_by(Application.applied_at, Application.id).yield_per(EXPORT_BATCH_SIZE)
+        return ndjson_response(
+            dumps({
+                'id': application_id, 'internshipId': internship_id, 'studentId': student_id,
+                'status': status, 'appliedAt': applied_at,
+                'student': {'id': student_id, 'name': name, 'email': email},
+            })
+            for application_id, internship_id, student_id, status, applied_at, name, email in rows
+        )
@@ -0,0 +1,94 @@
+import html
+
+from sqlalchemy import column, literal_column, or_, table, text
+from models import db, Internship
+
+# External-content FTS5 index over the searchable Internship columns. The
+# triggers keep it in step with every insert, update and delete on 'internship'.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS internship_fts USING fts5(
+        title, description, domain, company_name,
+        content='internship', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS internship_fts_insert AFTER INSERT ON internship BEGIN
+        INSERT INTO internship_fts(rowid, title, description, domain, company_name)
+        VALUES (new.id, new.title, new.description, new.domain, new.company_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS internship_fts_delete AFTER DELETE ON internship BEGIN
+        INSERT INTO internship_fts(internship_fts, rowid, title, description, domain, company_name)
+        VALUES ('delete', old.id, old.title, old.description, old.domain, old.company_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS internship_fts_update AFTER UPDATE ON internship BEGIN
+        INSERT INTO internship_fts(internship_fts, rowid, title, description, domain, company_name)
+        VALUES ('delete', old.id, old.title, old.description, old.domain, old.company_name);
+        INSERT INTO internship_fts(rowid, title, description, domain, company_name)
+        VALUES (new.id, new.title, new.description, new.domain, new.company_name);
+    END""",
+]
+
+internship_fts = table('internship_fts', column('rowid'))
+
+# BM25 column weights, in FTS column order: title, description, domain, company_name
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 6.0)
+
+# FTS marks matches with these control characters; render_highlight swaps them for <mark> tags once the text is escaped
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+def create_search_index():
+    """Creates the FTS index and its sync triggers, backfilling it the first time it is built."""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'internship_fts'")).first()
+        for statement in FTS_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO internship_fts(internship_fts) VALUES ('rebuild')"))
+
+def build_match_query(q):
+    """Turns free text into an FTS5 query that ANDs each word, so user input can't break the syntax."""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+def substring_search_query(query_string):
+    """Returns the same (Internship, title, description_snippet) rows as a case-insensitive substring match.
+
+    There is no relevance score here, so matches come newest first, and
+    nothing is highlighted.
+    """
+    columns = (Internship.title, Internship.description, Internship.domain, Internship.company_name)
+    return (
+        db.session.query(Internship, Internship.title, db.func.substr(Internship.description, 1, 200))
+        # autoescape makes '%' and '_' in the query match literally instead of as LIKE wildcards
+        .filter(or_(*(c.icontains(query_string, autoescape=True) for c in columns)))
+        .order_by(Internship.created_at.desc(), Internship.id.desc())
+    )
+
+def internship_search_query(query_string):
+    """Returns a query of (Internship, title_highlight, description_snippet) rows ordered by BM25 rank.
+
+    The highlights are raw posting text with MATCH_START/MATCH_END around each
+    match; pass them through render_highlight before they reach a client.
+    FTS5 is SQLite-only, so other databases fall back to
+    substring_search_query, which orders by recency rather than relevance.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return substring_search_query(query_string)
+    fts = literal_column('internship_fts')
+    rank = db.func.bm25(fts, *BM25_WEIGHTS)
+    return (
+        db.session.query(
+            Internship,
+            db.func.highlight(fts, 0, MATCH_START, MATCH_END),
+            db.func.snippet(fts, 1, MATCH_START, MATCH_END, '...', 24),
+        )
+        .join(internship_fts, internship_fts.c.rowid == Internship.id)
+        .filter(fts.op('MATCH')(build_match_query(query_string)))
+        .order_by(rank, Internship.id)
+    )
+
+def render_highlight(text):
+    """HTML-escapes highlighted text, then marks the matches, so <mark> is the only markup that can come out."""
+    if text is None:
+        return None
+    return html.escape(text).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
@@ -0,0 +1,124 @@
+import datetime
+import json
+import operator
+import time
+import zlib
+
+from flask import Response, jsonify, request, stream_with_context
+
+from metrics import add_phase_time, add_streamed_rows
+from models import Internship
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib encoder produces the same bytes
+    orjson = None
+
+def _isoformat(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(payload):
+    """Encodes a payload exactly as Flask's jsonify does: sorted keys, compact, ASCII-only, trailing newline."""
+    if orjson:
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        # orjson writes raw UTF-8 where Flask escapes to \uXXXX, so only those payloads take the slow path
+        if body.isascii():
+            return body + b'\n'
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':'), default=_isoformat) + '\n').encode()
+
+def json_response(payload, status=200):
+    start = time.perf_counter()
+    response = Response(dumps(payload), status=status, mimetype='application/json')
+    add_phase_time('serialization', time.perf_counter() - start)
+    return response
+
+# Compressed output is flushed to the client roughly this often while streaming
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def ndjson_response(lines):
+    """Streams an iterable of encoded NDJSON lines, gzipped when the client accepts it.
+
+    The generator runs inside the request context, so it can keep reading from
+    a database cursor while the response is being sent.
+    """
+    headers = {'Vary': 'Accept-Encoding'}
+    lines = _count_rows(lines)
+    if request.accept_encodings['gzip']:
+        headers['Content-Encoding'] = 'gzip'
+        lines = _gzip_chunks(lines)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson', headers=headers)
+
+def _count_rows(lines):
+    count = 0
+    try:
+        for line in lines:
+            count += 1
+            yield line
+    finally:
+        add_streamed_rows(count)
+
+def _gzip_chunks(lines):
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    pending, pending_size = [], 0
+    for line in lines:
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= STREAM_CHUNK_BYTES:
+            yield compressor.compress(b''.join(pending)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending, pending_size = [], 0
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
+
+# Each public field of Internship.to_dict, with the columns it is built from.
+# Datetimes are left for the encoder, which formats them like isoformat().
+INTERNSHIP_FIELDS = {
+    'id': ((Internship.id,), None),
+    'title': ((Internship.title,), None),
+    'description': ((Internship.description,), None),
+    'domain': ((Internship.domain,), None),
+    'company': ((Internship.company_id, Internship.company_name),
+                lambda company_id, name: {'id': company_id, 'name': name}),
+    'location': ((Internship.location_type, Internship.city, Internship.country),
+                 lambda location_type, city, country: {'type': location_type, 'city': city, 'country': country}),
+    'duration': ((Internship.duration,), None),
+    'stipend': ((Internship.stipend_amount, Internship.stipend_currency),
+                lambda amount, currency: {'amount': amount, 'currency': currency} if amount is not None else None),
+    'applicationDeadline': ((Internship.application_deadline,), None),
+    'createdAt': ((Internship.created_at,), None),
+}
+
+class InternshipProjection:
+    """Selects only the columns behind the requested to_dict fields and builds dicts from the row tuples.
+
+    id and created_at are always selected because the listing cursor is built from them.
+    """
+
+    def __init__(self, fields=None):
+        fields = fields or list(INTERNSHIP_FIELDS)
+        self.columns = [Internship.id, Internship.created_at]
+        for name in fields:
+            for column in INTERNSHIP_FIELDS[name][0]:
+                if column not in self.columns:
+                    self.columns.append(column)
+
+        positions = {column.key: i for i, column in enumerate(self.columns)}
+        self._builders = []
+        for name in fields:
+            columns, build = INTERNSHIP_FIELDS[name]
+            get = operator.itemgetter(*(positions[column.key] for column in columns))
+            self._builders.append((name, get, build))
+
+    @classmethod
+    def from_args(cls, args):
+        """Builds a projection from '?fields=id,title,company' and returns (projection, error_tuple)."""
+        if not args.get('fields'):
+            return cls(), None
+        fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in INTERNSHIP_FIELDS]
+        if unknown:
+            return None, (jsonify({"error": f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(INTERNSHIP_FIELDS)}"}), 400)
+        return cls(fields), None
+
+    def to_dict(self, row):
+        return {name: build(*get(row)) if build else get(row) for name, get, build in self._builders}
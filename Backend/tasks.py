@@ -0,0 +1,114 @@
+import collections
+import concurrent.futures
+import datetime
+import random
+import threading
+import uuid
+
+def schedule_later(delay, func):
+    """Calls func on a timer thread after delay seconds."""
+    timer = threading.Timer(delay, func)
+    timer.daemon = True
+    timer.start()
+
+class TaskQueue:
+    """Runs side-effecting calls (like Firebase admin updates) on a thread pool, off the request path.
+
+    Tasks share a key when they update the same thing, e.g. one user's display
+    name. A task submitted while another with its key is still queued replaces
+    that task's arguments instead of queueing a second call, and tasks with the
+    same key never run at the same time, so the latest update always lands last:
+    a task for a busy key waits in the queue, not in a pool thread, and is
+    dispatched when the key frees up. Retries are scheduled on a timer rather
+    than slept through, and a failing task gives way ('superseded') to a newer
+    one for its key instead of retrying stale arguments.
+    """
+
+    def __init__(self, max_workers=4, max_attempts=5, base_delay=0.5, max_history=10000, schedule=schedule_later):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_history = max_history
+        self._schedule = schedule
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task-queue')
+        self._lock = threading.Lock()
+        self._queued = {}
+        self._active = set()
+        self._tasks = collections.OrderedDict()
+
+    def submit(self, kind, key, owner, func, *args, **kwargs):
+        """Queues func(*args, **kwargs) and returns the task id to poll with status()."""
+        with self._lock:
+            task = self._queued.get((kind, key))
+            if task:
+                task['call'] = (func, args, kwargs)
+                return task['id']
+
+            task = {
+                'id': uuid.uuid4().hex, 'kind': kind, 'key': key, 'owner': owner,
+                'status': 'queued', 'attempts': 0, 'error': None,
+                'call': (func, args, kwargs), 'updatedAt': datetime.datetime.utcnow(),
+            }
+            self._queued[(kind, key)] = task
+            self._tasks[task['id']] = task
+            while len(self._tasks) > self.max_history:
+                self._tasks.popitem(last=False)
+            if (kind, key) not in self._active:
+                self._dispatch(task)
+        return task['id']
+
+    def status(self, task_id):
+        """Returns a JSON-ready snapshot of the task, or None if it is unknown or has aged out."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task: return None
+            return {
+                'id': task['id'], 'kind': task['kind'], 'owner': task['owner'], 'status': task['status'],
+                'attempts': task['attempts'], 'error': task['error'], 'updatedAt': task['updatedAt'].isoformat(),
+            }
+
+    def _update(self, task, **changes):
+        with self._lock:
+            task.update(changes, updatedAt=datetime.datetime.utcnow())
+
+    def _dispatch(self, task):
+        # Called with self._lock held. The task stays in _queued, taking new arguments, until it starts.
+        self._active.add((task['kind'], task['key']))
+        self._executor.submit(self._attempt, task)
+
+    def _finish(self, task, **changes):
+        with self._lock:
+            task.update(changes, updatedAt=datetime.datetime.utcnow())
+            key = (task['kind'], task['key'])
+            self._active.discard(key)
+            if key in self._queued:
+                self._dispatch(self._queued[key])
+
+    def _attempt(self, task):
+        with self._lock:
+            # From here on a new submission for this key queues a fresh task
+            if self._queued.get((task['kind'], task['key'])) is task:
+                del self._queued[(task['kind'], task['key'])]
+            func, args, kwargs = task['call']
+            attempt = task['attempts'] + 1
+            task.update(status='running', attempts=attempt, updatedAt=datetime.datetime.utcnow())
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            if attempt == self.max_attempts:
+                print(f"Warning: Task {task['kind']} for {task['key']} failed after {attempt} attempts: {e}")
+                self._finish(task, status='failed', error=str(e))
+                return
+            with self._lock:
+                superseded = (task['kind'], task['key']) in self._queued
+            if superseded:
+                self._finish(task, status='superseded', error=str(e))
+                return
+            self._update(task, status='retrying', error=str(e))
+            # Exponential backoff with jitter so retries from many tasks don't line up
+            delay = self.base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            self._schedule(delay, lambda: self._executor.submit(self._attempt, task))
+        else:
+            self._finish(task, status='succeeded', error=None)
+
+# Shared by every request in this worker process
+task_queue = TaskQueue()
@@ -0,0 +1,82 @@
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# create_app loads serviceAccountKey.json relative to the working directory
+os.chdir(BACKEND_DIR)
+
+_db_dir = tempfile.mkdtemp(prefix='internhub-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop('DATABASE_REPLICA_URL', None)
+os.environ.pop('RESPONSE_CACHE_URL', None)
+
+# Initialising Firebase here means create_app skips it, and with it the
+# background certificate prefetch that would otherwise reach out to Google
+import firebase_admin
+from firebase_admin import auth, credentials
+
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(credentials.Certificate('serviceAccountKey.json'))
+
+from app import app as flask_app
+from extensions import db
+from response_cache import MemoryCacheBackend, response_cache
+from models import User, Internship, StudentProfile
+from search import create_search_index
+
+with flask_app.app_context():
+    db.create_all()
+    create_search_index()
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    response_cache.backend = MemoryCacheBackend()
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        db.session.remove()
+
+@pytest.fixture
+def client(app, monkeypatch):
+    # Bearer tokens in tests are just the uid of the caller
+    monkeypatch.setattr(auth, 'verify_id_token', lambda id_token: {'uid': id_token, 'exp': time.time() + 3600})
+    return app.test_client()
+
+def bearer(uid):
+    return {'Authorization': f'Bearer {uid}'}
+
+@pytest.fixture
+def make_user(app):
+    def make_user(uid, role='student', **fields):
+        user = User(id=uid, email=f'{uid}@example.com', name=fields.pop('name', uid), role=role)
+        db.session.add(user)
+        if role == 'student':
+            db.session.add(StudentProfile(user_id=uid, **fields))
+        db.session.commit()
+        return user
+    return make_user
+
+@pytest.fixture
+def make_internship(app):
+    def make_internship(company_id='company', **fields):
+        values = {
+            'title': 'Backend Intern', 'description': 'Build APIs with Flask', 'domain': 'Software Development',
+            'company_name': 'Acme', 'company_id': company_id, 'location_type': 'remote', 'duration': '3 months',
+            'application_deadline': datetime.datetime.utcnow() + datetime.timedelta(days=30),
+        }
+        values.update(fields)
+        internship = Internship(**values)
+        db.session.add(internship)
+        db.session.commit()
+        return internship
+    return make_internship
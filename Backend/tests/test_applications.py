@@ -0,0 +1,101 @@
+import datetime
+
+from models import Application
+from tests.conftest import bearer
+
+def today():
+    return datetime.datetime.combine(datetime.datetime.utcnow().date(), datetime.time())
+
+def test_postings_stay_open_through_their_deadline_day(client, make_user, make_internship):
+    make_user('student')
+    due_today = make_internship(title='Due today', application_deadline=today())
+    make_internship(title='Due yesterday', application_deadline=today() - datetime.timedelta(days=1))
+
+    assert [i['title'] for i in client.get('/api/internships?open=true').json] == ['Due today']
+    assert client.post(f'/api/internships/{due_today.id}/apply', headers=bearer('student')).status_code == 201
+
+def test_applying_after_the_deadline_day_is_rejected(client, make_user, make_internship):
+    make_user('student')
+    closed = make_internship(application_deadline=today() - datetime.timedelta(days=1))
+    response = client.post(f'/api/internships/{closed.id}/apply', headers=bearer('student'))
+    assert response.status_code == 400
+
+def test_status_updates_reject_boolean_ids(client, make_user, make_internship):
+    make_user('company', role='company')
+    make_user('student')
+    internship = make_internship()
+    client.post(f'/api/internships/{internship.id}/apply', headers=bearer('student'))
+
+    response = client.patch(f'/api/internships/{internship.id}/applications',
+                            json={'status': 'accepted', 'applicationIds': [True]}, headers=bearer('company'))
+    assert response.status_code == 400
+    assert Application.query.one().status == 'pending'
+
+def apply_all(client, internship, students):
+    for uid in students:
+        assert client.post(f'/api/internships/{internship.id}/apply', headers=bearer(uid)).status_code == 201
+
+def test_applying_twice_is_reported_not_duplicated(client, make_user, make_internship):
+    make_user('student')
+    internship = make_internship()
+    assert client.post(f'/api/internships/{internship.id}/apply', headers=bearer('student')).status_code == 201
+
+    response = client.post(f'/api/internships/{internship.id}/apply', headers=bearer('student'))
+    assert response.status_code == 200
+    assert response.json == {"message": "Already applied"}
+    assert Application.query.count() == 1
+
+def test_applicants_page_newest_first_with_status_filter_and_counts(client, make_user, make_internship):
+    make_user('company', role='company')
+    students = [f'student{i}' for i in range(5)]
+    for uid in students:
+        make_user(uid)
+    internship = make_internship()
+    apply_all(client, internship, students)
+    ids = [a.id for a in Application.query.order_by(Application.id)]
+    client.patch(f'/api/internships/{internship.id}/applications',
+                 json={'status': 'accepted', 'applicationIds': ids[:2]}, headers=bearer('company'))
+
+    url = f'/api/internships/{internship.id}/applications'
+    first = client.get(f'{url}?limit=3', headers=bearer('company'))
+    second = client.get(f"{url}?limit=3&cursor={first.headers['X-Next-Cursor']}", headers=bearer('company'))
+    assert [a['id'] for a in first.json['applicants'] + second.json['applicants']] == ids[::-1]
+    assert 'X-Next-Cursor' not in second.headers
+    assert second.json['applicants'][0]['student'] == {'id': 'student1', 'name': 'student1',
+                                                       'email': 'student1@example.com'}
+    # Counts cover every applicant, not just the page or the filter
+    assert first.json['statusCounts'] == {'pending': 3, 'reviewed': 0, 'accepted': 2, 'rejected': 0}
+
+    accepted = client.get(f'{url}?status=accepted', headers=bearer('company')).json
+    assert [a['id'] for a in accepted['applicants']] == ids[1::-1]
+    assert accepted['statusCounts'] == first.json['statusCounts']
+    assert client.get(f'{url}?status=hired', headers=bearer('company')).status_code == 400
+
+def test_companies_cannot_see_or_triage_other_companies_applicants(client, make_user, make_internship):
+    make_user('company', role='company')
+    make_user('rival', role='company')
+    make_user('student')
+    internship = make_internship()
+    apply_all(client, internship, ['student'])
+
+    url = f'/api/internships/{internship.id}/applications'
+    assert client.get(url, headers=bearer('rival')).status_code == 403
+    response = client.patch(url, json={'status': 'rejected', 'applicationIds': [Application.query.one().id]},
+                            headers=bearer('rival'))
+    assert response.status_code == 403
+    assert Application.query.one().status == 'pending'
+
+def test_bulk_status_update_leaves_other_internships_alone(client, make_user, make_internship):
+    make_user('company', role='company')
+    for uid in ('student0', 'student1'):
+        make_user(uid)
+    internship, other = make_internship(), make_internship(title='Other')
+    apply_all(client, internship, ['student0', 'student1'])
+    apply_all(client, other, ['student0'])
+    mine = [a.id for a in Application.query.filter_by(internship_id=internship.id)]
+    theirs = Application.query.filter_by(internship_id=other.id).one().id
+
+    response = client.patch(f'/api/internships/{internship.id}/applications',
+                            json={'status': 'reviewed', 'applicationIds': mine + [theirs]}, headers=bearer('company'))
+    assert response.json == {"message": "Applications updated successfully", "updated": 2}
+    assert {a.id: a.status for a in Application.query} == {mine[0]: 'reviewed', mine[1]: 'reviewed', theirs: 'pending'}
@@ -0,0 +1,78 @@
+import csv
+import json
+
+import pytest
+
+from bulk_import import import_internships, read_ndjson, validate_row
+from models import Internship
+from tests.conftest import bearer
+
+VALID = {
+    'title': 'Data Intern', 'description': 'SQL all day', 'domain': 'Data', 'locationType': 'remote',
+    'duration': '2 months', 'applicationDeadline': '2099-01-01',
+}
+
+@pytest.mark.parametrize('changes, error', [
+    ({'title': {'en': 'Data Intern'}}, 'title must be a string'),
+    ({'city': 42}, 'city must be a string'),
+    ({'title': 'x' * 201}, 'title must be at most 200 characters'),
+    ({'stipendAmount': 1.9}, 'stipendAmount must be a whole number'),
+    ({'stipendAmount': True}, 'stipendAmount must be a whole number'),
+    ({'stipendAmount': '12.5'}, 'stipendAmount must be a whole number'),
+    ({'stipendAmount': [100]}, 'stipendAmount must be a whole number'),
+    ({'applicationDeadline': 20990101}, 'Invalid date format for applicationDeadline. Use YYYY-MM-DD.'),
+])
+def test_invalid_rows_are_rejected(changes, error):
+    assert validate_row({**VALID, **changes}, 'company', 'Acme') == (None, error)
+
+@pytest.mark.parametrize('stipend, expected', [(500, 500), (500.0, 500), ('500', 500), ('', None), (None, None)])
+def test_whole_number_stipends_are_accepted(stipend, expected):
+    values, error = validate_row({**VALID, 'stipendAmount': stipend}, 'company', 'Acme')
+    assert error is None
+    assert values['stipend_amount'] == expected
+
+def test_bad_rows_do_not_lose_the_rest_of_the_batch(client, make_user):
+    make_user('company', role='company')
+    lines = [VALID, {**VALID, 'title': {'en': 'Nested'}}, {**VALID, 'stipendAmount': 1.9}, {**VALID, 'title': 'Second'}]
+    response = client.post('/api/internships/bulk', data='\n'.join(json.dumps(line) for line in lines),
+                           content_type='application/x-ndjson', headers=bearer('company'))
+    assert response.status_code == 201
+    assert response.json['inserted'] == 2
+    assert [error['row'] for error in response.json['errors']] == [2, 3]
+    assert sorted(i.title for i in Internship.query) == ['Data Intern', 'Second']
+
+def ndjson(*lines):
+    return b''.join(line if isinstance(line, bytes) else json.dumps(line).encode() + b'\n' for line in lines)
+
+def test_undecodable_body_is_a_row_error_not_a_500(client, make_user):
+    make_user('company', role='company')
+    response = client.post('/api/internships/bulk', data=b'\xff\xfe{"a":1}\n' + ndjson(VALID),
+                           content_type='application/x-ndjson', headers=bearer('company'))
+    assert response.status_code == 201
+    assert response.json['inserted'] == 1
+    assert response.json['errors'][0]['row'] == 1
+    assert response.json['errors'][0]['error'].startswith('Invalid UTF-8')
+
+def test_bad_line_after_a_committed_batch_is_reported(app, make_user):
+    make_user('company', role='company')
+    # With one-row batches the first ten rows are committed before the bad line is read
+    lines = ndjson(*[{**VALID, 'title': f'Intern {i}'} for i in range(12)]) + b'{"title": "\xc3("}\n' + ndjson(VALID)
+    result = import_internships(read_ndjson(lines.splitlines(keepends=True)), 'company', 'Acme', batch_size=1)
+    assert result['inserted'] == 13
+    assert result['failed'] == 1
+    assert result['errors'][0]['row'] == 13
+    assert Internship.query.count() == 13
+
+def test_csv_errors_are_reported_per_row(client, make_user):
+    make_user('company', role='company')
+    header = ','.join(VALID).encode() + b'\r\n'
+    good = ','.join(VALID.values()).encode() + b'\r\n'
+    body = header + good + b'bad\x00row\r\n' + b'\xff' + good + b'x' * (csv.field_size_limit() + 1) + b'\r\n' + good
+    response = client.post('/api/internships/bulk', data=body, content_type='text/csv', headers=bearer('company'))
+    assert response.status_code == 201
+    assert response.json['inserted'] == 2
+    # Before Python 3.11 the NUL byte is a csv.Error; later versions parse it as a short row
+    assert [(e['row'], e['error'].split(':')[0]) for e in response.json['errors']][1:] == [
+        (3, 'Invalid UTF-8'), (4, 'Invalid CSV'),
+    ]
+    assert response.json['errors'][0]['row'] == 2
@@ -0,0 +1,59 @@
+import datetime
+
+from flask import Flask
+
+from database import configure_database
+from extensions import db
+from models import Internship, User
+
+def test_sqlite_connections_get_the_wal_pragmas(app):
+    with db.engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('busy_timeout') == 5000
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('cache_size') == -65536
+
+def make_routed_app(tmp_path, monkeypatch):
+    """Returns an app whose primary and replica are two SQLite files, each holding one differently named company."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv('DATABASE_REPLICA_URL', f"sqlite:///{tmp_path / 'replica.db'}")
+    routed_app = Flask(__name__)
+    configure_database(routed_app)
+    db.init_app(routed_app)
+    with routed_app.app_context():
+        for name, engine in (('primary', db.engine), ('replica', db.engines['replica'])):
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(User.__table__.insert().values(id='company', email='company@example.com',
+                                                            name=name, role='company'))
+    return routed_app
+
+def company_name():
+    return db.session.query(User.name).filter_by(id='company').scalar()
+
+def test_get_reads_go_to_the_replica_and_other_requests_to_the_primary(tmp_path, monkeypatch):
+    routed_app = make_routed_app(tmp_path, monkeypatch)
+    with routed_app.test_request_context(method='GET'):
+        assert company_name() == 'replica'
+    with routed_app.test_request_context(method='POST'):
+        assert company_name() == 'primary'
+    # Outside a request, e.g. in a CLI command or a background task, the primary is used
+    with routed_app.app_context():
+        assert company_name() == 'primary'
+
+def internship_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(db.select(db.func.count()).select_from(Internship.__table__)).scalar()
+
+def test_writes_during_a_get_are_flushed_to_the_primary(tmp_path, monkeypatch):
+    routed_app = make_routed_app(tmp_path, monkeypatch)
+    with routed_app.test_request_context(method='GET'):
+        db.session.add(Internship(title='Backend Intern', description='APIs', domain='Software Development',
+                                  company_name='Acme', company_id='company', location_type='remote',
+                                  duration='3 months', application_deadline=datetime.datetime(2030, 1, 1)))
+        db.session.commit()
+
+    with routed_app.app_context():
+        assert internship_count(db.engine) == 1
+        assert internship_count(db.engines['replica']) == 0
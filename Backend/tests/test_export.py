@@ -0,0 +1,96 @@
+import datetime
+import gzip
+import json
+import os
+
+import pytest
+from sqlalchemy import text
+
+from extensions import db
+from search import create_search_index
+
+# The memory test exports this many rows; lower it for a quicker local run
+EXPORT_RSS_ROWS = int(os.environ.get('EXPORT_RSS_ROWS', 1000000))
+
+SEED_SQL = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+INSERT INTO internship (title, description, domain, company_name, company_id, location_type, duration,
+                        application_deadline, created_at)
+SELECT 'Intern ' || i, 'Description for posting ' || i, 'Data', 'Acme', 'company', 'remote', '3 months',
+       datetime('2030-01-01'), datetime('2024-01-01', '+' || i || ' seconds')
+FROM n
+"""
+
+def rss_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def test_export_streams_ndjson_and_varies_on_encoding(client, make_internship):
+    make_internship(title='First')
+    make_internship(title='Second')
+
+    plain = client.get('/api/internships/export')
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+    assert [json.loads(line)['title'] for line in plain.data.splitlines()] == ['First', 'Second']
+
+    compressed = client.get('/api/internships/export', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.data) == plain.data
+
+@pytest.mark.parametrize('since', ['2024-01-01T10:00:00', '2024-01-01T15:30:00+05:30', '2024-01-01T10:00:00Z'])
+def test_since_is_compared_in_utc(client, make_internship, since):
+    make_internship(title='Before', created_at=datetime.datetime(2024, 1, 1, 9, 0))
+    make_internship(title='After', created_at=datetime.datetime(2024, 1, 1, 11, 0))
+
+    response = client.get('/api/internships/export', query_string={'since': since})
+    assert [json.loads(line)['title'] for line in response.data.splitlines()] == ['After']
+
+def metric(client, series):
+    for line in client.get('/metrics').get_data(as_text=True).splitlines():
+        if line.startswith(series + ' '):
+            return float(line.split()[-1])
+    return 0.0
+
+def test_export_metrics_cover_the_streamed_body(client, make_internship):
+    for _ in range(3):
+        make_internship()
+    rows_before = metric(client, 'internhub_streamed_rows_total{endpoint="export_internships"}')
+    statements_before = metric(client, 'internhub_sql_statements_total{endpoint="export_internships"}')
+
+    with client.get('/api/internships/export') as response:
+        assert len(response.get_data().splitlines()) == 3
+
+    assert metric(client, 'internhub_streamed_rows_total{endpoint="export_internships"}') == rows_before + 3
+    # The export's SELECT runs while the body streams, after the view has returned
+    assert metric(client, 'internhub_sql_statements_total{endpoint="export_internships"}') == statements_before + 1
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason="reads RSS from /proc")
+def test_export_memory_stays_flat_over_a_large_table(client, make_user):
+    make_user('company', role='company')
+    # Seeding skips the FTS triggers, which would otherwise index every row
+    for trigger in ('internship_fts_insert', 'internship_fts_delete', 'internship_fts_update'):
+        db.session.execute(text(f'DROP TRIGGER {trigger}'))
+    try:
+        db.session.execute(text(SEED_SQL), {'rows': EXPORT_RSS_ROWS})
+        db.session.commit()
+
+        baseline = rss_bytes()
+        response = client.get('/api/internships/export', buffered=False)
+        rows, exported_bytes, samples = 0, 0, []
+        for chunk in response.response:
+            rows += chunk.count(b'\n')
+            exported_bytes += len(chunk)
+            if rows % 10000 < chunk.count(b'\n') or not samples:
+                samples.append(rss_bytes())
+        response.close()
+    finally:
+        db.session.rollback()
+        db.session.execute(text('DELETE FROM internship'))
+        db.session.commit()
+        create_search_index()
+
+    growth = max(samples) - baseline
+    print(f"\nExported {rows} rows ({exported_bytes / 2**20:.0f} MiB), RSS grew {growth / 2**20:.1f} MiB")
+    assert rows == EXPORT_RSS_ROWS
+    assert growth < 32 * 2**20
@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+from extensions import db
+from models import Internship
+from routes import filter_internships
+from tests.conftest import bearer
+
+def test_keyset_pages_cover_every_internship_once(client, make_internship):
+    created = datetime.datetime(2024, 1, 1)
+    # Pairs of rows share a created_at so the id tie-breaker is exercised
+    for i in range(25):
+        make_internship(title=f'Intern {i}', created_at=created + datetime.timedelta(minutes=i // 2))
+
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/internships', query_string={'limit': 7, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [(i['createdAt'], i['id']) for i in response.json]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor: break
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+def test_filters_narrow_the_listing(client, make_internship):
+    make_internship(title='Match', domain='Marketing', country='India', stipend_amount=500)
+    make_internship(title='Low stipend', domain='Marketing', country='India', stipend_amount=100)
+    make_internship(title='Other domain', domain='Design', country='India', stipend_amount=500)
+
+    response = client.get('/api/internships?domain=Marketing&country=India&minStipend=200')
+    assert [i['title'] for i in response.json] == ['Match']
+
+def test_bad_paging_parameters_are_rejected(client):
+    assert client.get('/api/internships?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/internships?limit=ten').status_code == 400
+    assert client.get('/api/internships?minStipend=lots').status_code == 400
+
+def listing_plan(args):
+    """Returns the EXPLAIN QUERY PLAN details of a first listing page of ids with these filters."""
+    query, _ = filter_internships(db.session.query(Internship.id), args)
+    compiled = query.order_by(Internship.created_at.desc(), Internship.id.desc()).limit(21).statement.compile(db.engine)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', parameters).all()
+    return ' | '.join(row[-1] for row in plan)
+
+@pytest.mark.parametrize('args', [
+    {}, {'domain': 'Design'}, {'locationType': 'remote'}, {'country': 'India'},
+    {'country': 'India', 'city': 'Pune'}, {'minStipend': '100'}, {'open': 'true'},
+])
+def test_each_filter_is_served_in_index_order(app, args):
+    details = listing_plan(args)
+    assert 'TEMP B-TREE' not in details, details
+
+@pytest.mark.parametrize('args', [{'minStipend': '100'}, {'open': 'true'}])
+def test_range_filters_are_checked_from_the_index(app, args):
+    assert 'COVERING INDEX ix_internship_created_id_stipend_deadline' in listing_plan(args)
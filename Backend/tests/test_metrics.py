@@ -0,0 +1,57 @@
+import threading
+import time
+
+from flask import Flask
+
+import metrics
+
+def make_app(monkeypatch, tmp_path):
+    monkeypatch.setenv('SLOW_REQUEST_MS', '1')
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '1')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    app = Flask(__name__)
+    metrics.init_metrics(app)
+    return app
+
+def test_profiler_stops_when_the_view_raises(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path)
+
+    @app.route('/boom')
+    def boom():
+        time.sleep(0.01)
+        raise RuntimeError('boom')
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.01)
+        return 'ok'
+
+    client = app.test_client()
+    assert client.get('/boom').status_code == 500
+    assert not metrics._profiler_lock.locked()
+    assert len(list(tmp_path.glob('boom-*.prof'))) == 1
+
+    # The next request can take the profiler again
+    assert client.get('/slow').status_code == 200
+    assert len(list(tmp_path.glob('slow-*.prof'))) == 1
+
+def test_concurrent_requests_share_one_profiler(monkeypatch, tmp_path):
+    app = make_app(monkeypatch, tmp_path)
+    both_started = threading.Barrier(2, timeout=5)
+
+    @app.route('/slow')
+    def slow():
+        both_started.wait()
+        time.sleep(0.01)
+        return 'ok'
+
+    statuses = []
+    def get():
+        statuses.append(app.test_client().get('/slow').status_code)
+    threads = [threading.Thread(target=get) for _ in range(2)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert statuses == [200, 200]
+    assert len(list(tmp_path.glob('slow-*.prof'))) == 1
+    assert not metrics._profiler_lock.locked()
@@ -0,0 +1,46 @@
+from database import record_queries
+from tests.conftest import bearer
+
+def test_saved_internships_load_in_one_statement(client, make_user, make_internship):
+    make_user('student')
+    for i in range(30):
+        internship_id = make_internship(title=f'Intern {i}').id
+        client.post(f'/api/internships/{internship_id}/save', headers=bearer('student'))
+
+    with record_queries() as statements:
+        response = client.get('/api/me/saved', headers=bearer('student'))
+    assert len(response.json) == 30
+    assert len(statements) == 1
+
+def test_saving_is_a_single_upsert(client, make_user, make_internship):
+    make_user('student')
+    internship_id = make_internship().id
+
+    with record_queries() as statements:
+        assert client.post(f'/api/internships/{internship_id}/save', headers=bearer('student')).status_code == 201
+    assert len(statements) == 1
+
+    # A repeat save or a missing internship costs one extra existence check
+    with record_queries() as statements:
+        assert client.post(f'/api/internships/{internship_id}/save', headers=bearer('student')).json == {"message": "Already saved"}
+    assert len(statements) == 2
+    assert client.post('/api/internships/9999/save', headers=bearer('student')).status_code == 404
+
+def test_unsave_is_a_single_delete(client, make_user, make_internship):
+    make_user('student')
+    internship_id = make_internship().id
+    client.post(f'/api/internships/{internship_id}/save', headers=bearer('student'))
+
+    with record_queries() as statements:
+        assert client.delete(f'/api/internships/{internship_id}/save', headers=bearer('student')).status_code == 200
+    assert len(statements) == 1
+    assert client.delete(f'/api/internships/{internship_id}/save', headers=bearer('student')).status_code == 404
+
+def test_profile_read_is_one_joined_query_and_never_writes(client, make_user):
+    make_user('student', university='IIT')
+
+    with record_queries() as statements:
+        response = client.get('/api/me/profile', headers=bearer('student'))
+    assert response.json['university'] == 'IIT'
+    assert len(statements) == 1
+    assert statements[0].startswith('SELECT')
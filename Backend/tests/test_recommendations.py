@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+
+import recommendations
+import routes
+from app import create_app
+from recommendations import SkillIndex
+from tests.conftest import bearer
+
+NOW = datetime.datetime(2030, 1, 1)
+
+def row(internship_id, title, description='', domain='', days_left=30):
+    return internship_id, title, description, domain, NOW + datetime.timedelta(days=days_left)
+
+ROWS = [
+    row(1, 'Backend Intern', 'Python and SQL services', 'Software Development'),
+    row(2, 'Data Intern', 'SQL dashboards', 'Data'),
+    row(3, 'Design Intern', 'Figma mockups', 'Design'),
+    row(4, 'Python Intern', 'Python scripting', 'Software Development', days_left=-1),
+]
+
+def assert_same_ranking(ranked, expected):
+    assert [internship_id for internship_id, _ in ranked] == [internship_id for internship_id, _ in expected]
+    assert [score for _, score in ranked] == pytest.approx([score for _, score in expected], rel=1e-5)
+
+def test_best_matching_open_postings_rank_first():
+    index = SkillIndex()
+    index.build(ROWS)
+    ranked = index.recommend('python, sql', 10, cutoff=NOW)
+    # Posting 4 matches best but its deadline has passed
+    assert [internship_id for internship_id, _ in ranked] == [1, 2]
+    assert index.recommend('figma', 1, cutoff=NOW)[0][0] == 3
+    assert index.recommend('cobol', 10, cutoff=NOW) == []
+
+def test_added_postings_are_ranked_alongside_built_ones():
+    built = SkillIndex()
+    built.build(ROWS)
+    built.add(*row(5, 'SQL Intern', 'SQL and more SQL', 'Data'))
+
+    rebuilt = SkillIndex()
+    rebuilt.build(ROWS + [row(5, 'SQL Intern', 'SQL and more SQL', 'Data')])
+    assert_same_ranking(built.recommend('sql', 10, cutoff=NOW), rebuilt.recommend('sql', 10, cutoff=NOW))
+
+def test_merging_the_delta_keeps_rankings(monkeypatch):
+    monkeypatch.setattr(recommendations, 'DELTA_MERGE_SIZE', 3)
+    index = SkillIndex()
+    index.build(ROWS[:1])
+    for r in ROWS[1:]:
+        index.add(*r)
+    assert index._segment.max_id == 4 and not index._delta_deadlines
+
+    rebuilt = SkillIndex()
+    rebuilt.build(ROWS)
+    assert_same_ranking(index.recommend('python sql figma', 10, cutoff=NOW), rebuilt.recommend('python sql figma', 10, cutoff=NOW))
+
+def test_saved_index_loads_identically(tmp_path):
+    index = SkillIndex()
+    index.build(ROWS)
+    index.add(*row(5, 'SQL Intern', 'SQL', 'Data'))
+    path = tmp_path / 'skill_index.npz'
+    index.save(path)
+
+    loaded = SkillIndex()
+    loaded.load(path)
+    assert len(loaded) == 5
+    assert_same_ranking(loaded.recommend('sql python', 10, cutoff=NOW), index.recommend('sql python', 10, cutoff=NOW))
+
+def test_endpoint_waits_for_the_index_then_recommends(client, make_user, make_internship, monkeypatch):
+    monkeypatch.setattr(routes, 'skill_index', SkillIndex())
+    make_user('student', skills='Python, SQL')
+    backend = make_internship(title='Backend Intern', description='Python and SQL')
+    make_internship(title='Design Intern', description='Figma', domain='Design')
+
+    response = client.get('/api/me/recommendations', headers=bearer('student'))
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+    routes.skill_index._warmup.join(timeout=10)
+    response = client.get('/api/me/recommendations', headers=bearer('student'))
+    assert response.status_code == 200
+    assert [r['id'] for r in response.json] == [backend.id]
+
+    # Postings from other workers are picked up by the next refresh
+    later = make_internship(title='Python Intern')
+    ids = [r['id'] for r in client.get('/api/me/recommendations', headers=bearer('student')).json]
+    assert later.id in ids
+
+def test_creating_the_app_or_running_commands_does_not_build_the_index(make_internship, monkeypatch, tmp_path):
+    monkeypatch.setattr(routes, 'skill_index', SkillIndex())
+    make_internship()
+    cli_app = create_app()
+    result = cli_app.test_cli_runner().invoke(args=['build-skill-index', '--output', str(tmp_path / 'index.npz')])
+    assert result.exit_code == 0, result.output
+    assert 'Indexed 1 internships' in result.output
+    # Only the command's own index was built; the worker's waits for a request that needs it
+    cli_app.test_client().get('/api/internships')
+    assert routes.skill_index._warmup is None
+    assert not routes.skill_index.ready
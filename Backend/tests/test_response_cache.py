@@ -0,0 +1,100 @@
+import concurrent.futures
+import datetime
+
+from bulk_import import import_internships
+from extensions import db
+from models import TableVersion
+from response_cache import response_cache
+from tests.conftest import bearer
+
+NEW_INTERNSHIP = {
+    'title': 'Data Intern', 'description': 'SQL all day', 'domain': 'Data', 'locationType': 'remote',
+    'duration': '2 months', 'applicationDeadline': '2099-01-01',
+}
+
+def test_repeat_reads_are_served_from_cache(client, make_internship):
+    make_internship()
+    first = client.get('/api/internships')
+    second = client.get('/api/internships')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+
+def test_matching_etag_gets_not_modified(client, make_internship):
+    make_internship()
+    etag = client.get('/api/internships').headers['ETag']
+    response = client.get('/api/internships', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_posting_an_internship_invalidates_cached_reads(client, make_user, make_internship):
+    make_user('company', role='company')
+    make_internship()
+    etag = client.get('/api/internships').headers['ETag']
+
+    assert client.post('/api/internships', json=NEW_INTERNSHIP, headers=bearer('company')).status_code == 201
+
+    response = client.get('/api/internships', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json[0]['title'] == 'Data Intern'
+
+def test_errors_are_not_cached(client):
+    assert client.get('/api/internships/12345').status_code == 404
+    assert 'ETag' not in client.get('/api/internships/12345').headers
+
+def test_writes_from_another_worker_invalidate_cached_reads(client, make_internship):
+    make_internship()
+    etag = client.get('/api/internships').headers['ETag']
+
+    # Another worker commits a posting; only the shared version row tells this one
+    make_internship(title='Design Intern')
+    TableVersion.bump('internship')
+    db.session.commit()
+
+    response = client.get('/api/internships', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert len(response.json) == 2
+
+def test_bulk_import_invalidates_cached_reads(client, make_user):
+    make_user('company', role='company')
+    client.get('/api/internships')
+    rows = [(1, {**NEW_INTERNSHIP, 'stipendAmount': 100}, None)]
+    import_internships(rows, 'company', 'Acme')
+    assert len(client.get('/api/internships').json) == 1
+
+def test_time_dependent_filters_are_never_served_from_cache(client, make_internship):
+    internship = make_internship()
+    first = client.get('/api/internships?open=true')
+    assert first.headers['X-Cache'] == 'BYPASS'
+    assert len(first.json) == 1
+
+    # The deadline passing changes the result without any write bumping the version
+    internship.application_deadline = datetime.datetime.utcnow() - datetime.timedelta(days=2)
+    db.session.commit()
+    second = client.get('/api/internships?open=true', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.json == []
+
+def test_hit_ratio_is_exported_in_metrics(client, make_internship):
+    make_internship()
+    client.get('/api/internships')
+    client.get('/api/internships')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'internhub_cache_requests_total{cache="response",result="hit"}' in body
+    assert f'internhub_cache_hit_ratio{{cache="response"}} {response_cache.hit_ratio}' in body
+
+def test_counters_add_up_under_concurrent_requests(app, make_internship):
+    make_internship()
+    hits, misses = response_cache.hits, response_cache.misses
+
+    def read(_):
+        client = app.test_client()
+        for _ in range(50):
+            assert client.get('/api/internships').status_code == 200
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(read, range(8)))
+    assert (response_cache.hits - hits) + (response_cache.misses - misses) == 400
+    assert response_cache.hits - hits >= 392
@@ -0,0 +1,49 @@
+from extensions import db
+from models import SavedInternship, upgrade_schema
+from tests.conftest import bearer
+
+def index_names(table_name):
+    # Read sqlite_master rather than PRAGMA index_list, which a pooled connection
+    # can answer from the schema it cached before the test rebuilt the table
+    return set(db.session.execute(db.text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table "
+        "AND name NOT LIKE 'sqlite_autoindex%'"
+    ), {'table': table_name}).scalars())
+
+def test_upgrade_adds_the_saved_constraint_to_an_older_table(client, make_user, make_internship):
+    make_user('student')
+    first, second = make_internship().id, make_internship().id
+    # The table as create_all made it before the unique constraint existed, holding duplicate saves
+    SavedInternship.__table__.drop(db.engine)
+    with db.engine.begin() as conn:
+        conn.execute(db.text(
+            "CREATE TABLE saved_internship (id INTEGER PRIMARY KEY, "
+            "student_id VARCHAR(50) NOT NULL REFERENCES user (id), "
+            "internship_id INTEGER NOT NULL REFERENCES internship (id))"
+        ))
+        conn.execute(db.text(
+            "INSERT INTO saved_internship (student_id, internship_id) VALUES "
+            "('student', :first), ('student', :second), ('student', :first), ('student', :first)"
+        ), {'first': first, 'second': second})
+
+    upgrade_schema()
+
+    rows = db.session.query(SavedInternship.id, SavedInternship.internship_id).order_by(SavedInternship.id).all()
+    assert rows == [(1, first), (2, second)]
+    assert 'uq_saved_internship_student_internship' in index_names('saved_internship')
+    response = client.post(f'/api/internships/{first}/save', headers=bearer('student'))
+    assert response.json == {"message": "Already saved"}
+
+def test_upgrade_restores_missing_indexes_and_is_idempotent(app):
+    with db.engine.begin() as conn:
+        conn.execute(db.text("DROP INDEX ix_application_internship_applied"))
+        conn.execute(db.text("DROP INDEX ix_internship_country_created_id"))
+    before = {table: index_names(table) for table in ('application', 'internship', 'saved_internship')}
+
+    upgrade_schema()
+    upgrade_schema()
+
+    assert index_names('application') == before['application'] | {'ix_application_internship_applied'}
+    assert index_names('internship') == before['internship'] | {'ix_internship_country_created_id'}
+    # A table create_all already gave the constraint gets no second copy of it
+    assert index_names('saved_internship') == before['saved_internship']
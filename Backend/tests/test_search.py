@@ -0,0 +1,31 @@
+import datetime
+
+from extensions import db
+from search import internship_search_query, render_highlight
+
+def test_highlights_escape_posting_text(client, make_internship):
+    make_internship(title='Python <script>alert(1)</script> Intern', description='Write <b>Python</b> & SQL')
+    response = client.get('/api/internships/search?q=python')
+    assert response.status_code == 200
+    highlight = response.json[0]['highlight']
+    assert highlight['title'] == '<mark>Python</mark> &lt;script&gt;alert(1)&lt;/script&gt; Intern'
+    assert highlight['description'] == 'Write &lt;b&gt;<mark>Python</mark>&lt;/b&gt; &amp; SQL'
+
+def test_render_highlight_only_emits_mark_tags():
+    assert render_highlight('\x02a\x03 <img src=x onerror=alert(1)>') == '<mark>a</mark> &lt;img src=x onerror=alert(1)&gt;'
+    assert render_highlight(None) is None
+
+def test_substring_fallback_matches_wildcards_literally(app, make_internship, monkeypatch):
+    make_internship(title='100% remote')
+    make_internship(title='1000 remote')
+    # Databases without FTS5 take the LIKE path
+    monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+    assert [i.title for i, _, _ in internship_search_query('100%')] == ['100% remote']
+    assert internship_search_query('_00').all() == []
+
+def test_substring_fallback_orders_newest_first(app, make_internship, monkeypatch):
+    older = make_internship(title='Python Intern', created_at=datetime.datetime(2024, 1, 1))
+    newer = make_internship(title='Intern', description='Some python', created_at=datetime.datetime(2024, 2, 1))
+    monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+    # The title match would rank first by BM25; without FTS5 recency decides
+    assert [i.id for i, _, _ in internship_search_query('python')] == [newer.id, older.id]
@@ -0,0 +1,32 @@
+import datetime
+
+import pytest
+from flask import jsonify
+
+import serializers
+from extensions import db
+from serializers import InternshipProjection, dumps
+
+ROWS = {
+    'ascii': {},
+    'non-ascii': {'title': 'Ingénieur stagiaire', 'description': 'データ分析 — Zürich “remote” 🚀', 'city': 'Zürich'},
+    'null stipend': {'stipend_amount': None, 'stipend_currency': None},
+    'zero stipend': {'stipend_amount': 0},
+}
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def encoder(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(serializers, 'orjson', None)
+    elif serializers.orjson is None:
+        pytest.skip("orjson is not installed")
+
+@pytest.mark.parametrize('fields', ROWS.values(), ids=ROWS.keys())
+def test_projection_bytes_match_jsonify_of_to_dict(app, make_internship, encoder, fields):
+    values = {'stipend_amount': 1500, 'city': 'Pune', 'country': 'India',
+              'created_at': datetime.datetime(2024, 5, 1, 9, 30, 15, 123456), **fields}
+    internship = make_internship(**values)
+    projection = InternshipProjection()
+    row = db.session.query(*projection.columns).filter_by(id=internship.id).one()
+
+    assert dumps([projection.to_dict(row)]) == jsonify([internship.to_dict()]).get_data()
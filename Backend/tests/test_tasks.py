@@ -0,0 +1,123 @@
+import threading
+import time
+
+from firebase_admin import auth
+
+from tasks import TaskQueue, schedule_later
+from tests.conftest import bearer
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for the task queue"
+        time.sleep(0.01)
+
+def test_queued_updates_for_the_same_key_are_coalesced():
+    queue = TaskQueue(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    # Occupy the only worker so the next submissions stay queued
+    blocker = queue.submit('block', 'other', 'owner', release.wait)
+    first = queue.submit('sync_display_name', 'uid', 'uid', calls.append, 'Ada')
+    second = queue.submit('sync_display_name', 'uid', 'uid', calls.append, 'Ada Lovelace')
+    assert first == second
+    release.set()
+
+    wait_for(lambda: queue.status(first)['status'] == 'succeeded')
+    assert calls == ['Ada Lovelace']
+    assert queue.status(blocker)['status'] == 'succeeded'
+
+def test_failed_calls_are_retried_with_backoff():
+    delays = []
+    def schedule(delay, func):
+        delays.append(delay)
+        schedule_later(delay, func)
+    queue = TaskQueue(max_attempts=3, base_delay=0.01, schedule=schedule)
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError('admin API unavailable')
+
+    task_id = queue.submit('sync_display_name', 'uid', 'uid', flaky)
+    wait_for(lambda: queue.status(task_id)['status'] == 'succeeded')
+    assert queue.status(task_id)['attempts'] == 3
+    assert len(delays) == 2 and delays[1] > delays[0] * 0.5
+
+def test_calls_that_keep_failing_are_marked_failed():
+    queue = TaskQueue(max_attempts=2, base_delay=0)
+    def broken():
+        raise RuntimeError('nope')
+
+    task_id = queue.submit('sync_display_name', 'uid', 'uid', broken)
+    wait_for(lambda: queue.status(task_id)['status'] == 'failed')
+    assert queue.status(task_id)['error'] == 'nope'
+
+def test_retry_backoff_does_not_hold_a_worker():
+    queue = TaskQueue(max_workers=1)
+    pending_retries, calls = [], []
+    queue._schedule = lambda delay, func: pending_retries.append(func)
+
+    def flaky(name):
+        calls.append(name)
+        if calls.count(name) == 1 and name == 'Ada':
+            raise RuntimeError('admin API unavailable')
+
+    first = queue.submit('sync_display_name', 'uid', 'uid', flaky, 'Ada')
+    wait_for(lambda: queue.status(first)['status'] == 'retrying')
+    # While the retry waits, the only worker is free for other keys, and the same key queues behind it
+    newer = queue.submit('sync_display_name', 'uid', 'uid', flaky, 'Ada Lovelace')
+    other = queue.submit('sync_display_name', 'other', 'other', flaky, 'Grace')
+    wait_for(lambda: queue.status(other)['status'] == 'succeeded')
+    assert queue.status(newer)['status'] == 'queued'
+
+    pending_retries.pop()()
+    wait_for(lambda: queue.status(newer)['status'] == 'succeeded')
+    assert calls == ['Ada', 'Grace', 'Ada', 'Ada Lovelace']
+    assert queue.status(first)['status'] == 'succeeded'
+    assert not queue._active and not queue._queued
+
+def test_failing_task_gives_way_to_a_newer_one():
+    queue = TaskQueue(base_delay=0)
+    pending_retries, calls = [], []
+    queue._schedule = lambda delay, func: pending_retries.append(func)
+
+    def update(name):
+        calls.append(name)
+        if name == 'stale': raise RuntimeError('admin API unavailable')
+
+    first = queue.submit('sync_display_name', 'uid', 'uid', update, 'stale')
+    wait_for(lambda: queue.status(first)['status'] == 'retrying')
+    newer = queue.submit('sync_display_name', 'uid', 'uid', update, 'fresh')
+    pending_retries.pop()()
+
+    wait_for(lambda: queue.status(newer)['status'] == 'succeeded')
+    assert queue.status(first)['status'] == 'superseded'
+    assert calls == ['stale', 'stale', 'fresh']
+    assert not queue._active and not queue._queued
+
+def test_profile_updates_do_not_wait_for_a_slow_admin_api(client, make_user, monkeypatch):
+    make_user('student')
+    synced = []
+    def slow_update_user(uid, display_name):
+        time.sleep(0.5)
+        synced.append(display_name)
+    monkeypatch.setattr(auth, 'update_user', slow_update_user)
+
+    latencies = []
+    for i in range(50):
+        start = time.perf_counter()
+        response = client.put('/api/me/profile', json={'name': f'Ada {i}'}, headers=bearer('student'))
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    task_id = response.json['syncTaskId']
+
+    p99 = sorted(latencies)[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(f"\nPUT /api/me/profile p99 with a 500 ms admin API: {p99 * 1000:.1f} ms")
+    assert p99 < 0.25
+
+    # Updates queued behind the first slow call were coalesced into the latest name
+    wait_for(lambda: client.get(f'/api/me/tasks/{task_id}', headers=bearer('student')).json['status'] == 'succeeded')
+    assert synced[-1] == 'Ada 49_student'
+    assert len(synced) < 50
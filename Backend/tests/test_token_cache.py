@@ -0,0 +1,135 @@
+import datetime
+import http.server
+import json
+import threading
+import time
+
+import firebase_admin
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from firebase_admin import auth, _token_gen
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token as google_id_token
+
+from token_cache import TokenCache
+
+AUDIENCE = 'internhub-test'
+KEY_ID = 'test-key'
+
+@pytest.fixture(scope='module')
+def signer():
+    """A local stand-in for Google's token signer and its x509 certificate endpoint."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.test')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    body = json.dumps({KEY_ID: cert.public_bytes(serialization.Encoding.PEM).decode()}).encode()
+
+    class CertHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), CertHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def sign(uid, lifetime=3600):
+        issued = int(time.time())
+        claims = {'uid': uid, 'sub': uid, 'aud': AUDIENCE, 'iat': issued, 'exp': issued + lifetime}
+        return jwt.encode(claims, key, algorithm='RS256', headers={'kid': KEY_ID})
+
+    sign.certs_url = f'http://127.0.0.1:{server.server_address[1]}/certs'
+    yield sign
+    server.shutdown()
+
+@pytest.fixture
+def verify(signer):
+    request = google_requests.Request()
+    calls = []
+    def verify(id_token):
+        calls.append(id_token)
+        return google_id_token.verify_token(id_token, request, audience=AUDIENCE, certs_url=signer.certs_url)
+    verify.calls = calls
+    return verify
+
+def test_repeat_tokens_skip_signature_verification(signer, verify):
+    cache = TokenCache(verify)
+    tokens = [signer(f'user-{i}') for i in range(20)]
+
+    start = time.perf_counter()
+    for token in tokens:
+        cache.verify(token)
+    uncached = (time.perf_counter() - start) / len(tokens)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        for token in tokens:
+            assert cache.verify(token)['uid'].startswith('user-')
+    cached = (time.perf_counter() - start) / (10 * len(tokens))
+
+    assert len(verify.calls) == len(tokens)
+    assert cache.hit_ratio == pytest.approx(200 / 220)
+    assert cached < uncached
+    print(f"\ntoken cache hit ratio {cache.hit_ratio:.2%}, "
+          f"verify {uncached * 1e6:.0f}us -> {cached * 1e6:.1f}us per call")
+
+def test_invalid_tokens_are_rejected_and_not_cached(signer, verify):
+    cache = TokenCache(verify)
+    forged = signer('mallory')[:-4] + 'AAAA'
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.verify(forged)
+    assert len(verify.calls) == 2
+    assert cache.hits == 0
+
+def test_entries_expire_at_the_tokens_exp_claim():
+    now = [1000.0]
+    calls = []
+    def verify(id_token):
+        calls.append(id_token)
+        return {'uid': id_token, 'exp': 1060}
+    cache = TokenCache(verify, clock=lambda: now[0])
+
+    cache.verify('a')
+    now[0] = 1059
+    cache.verify('a')
+    now[0] = 1060
+    cache.verify('a')
+    assert calls == ['a', 'a']
+
+def test_least_recently_used_entries_are_evicted():
+    calls = []
+    def verify(id_token):
+        calls.append(id_token)
+        return {'uid': id_token, 'exp': time.time() + 3600}
+    cache = TokenCache(verify, max_size=2)
+
+    cache.verify('a')
+    cache.verify('b')
+    cache.verify('a')  # 'b' is now the least recently used
+    cache.verify('c')
+    cache.verify('a')
+    cache.verify('b')
+    assert calls == ['a', 'b', 'c', 'b']
+    assert len(cache._entries) == 2
+
+def test_cert_prefetch_internals_still_exist():
+    """start_cert_prefetch reaches into private firebase_admin APIs; fail loudly if an upgrade moves them."""
+    client = auth._get_client(firebase_admin.get_app())
+    assert callable(client._token_verifier.request)
+    assert _token_gen.ID_TOKEN_CERT_URI.startswith('https://')
@@ -0,0 +1,61 @@
+import collections
+import hashlib
+import threading
+import time
+
+import firebase_admin
+from firebase_admin import auth, _token_gen
+
+class TokenCache:
+    """A bounded LRU of verified Firebase ID tokens, each kept until its own 'exp' claim."""
+
+    def __init__(self, verify, max_size=10000, clock=time.time):
+        self._verify = verify
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, id_token):
+        """Returns the decoded token, only running the real verification on a cache miss."""
+        # Key on a digest so raw bearer tokens never sit in memory as dict keys
+        key = hashlib.sha256(id_token.encode()).hexdigest()
+        with self._lock:
+            decoded_token = self._entries.get(key)
+            if decoded_token and decoded_token['exp'] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return decoded_token
+            self._entries.pop(key, None)
+            self.misses += 1
+
+        # Verification errors propagate and are never cached
+        decoded_token = self._verify(id_token)
+        with self._lock:
+            self._entries[key] = decoded_token
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return decoded_token
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+def start_cert_prefetch(interval=60):
+    """Keeps Google's token-signing certs warm in firebase_admin's HTTP cache from a daemon thread."""
+    def refresh():
+        while True:
+            try:
+                # Same cache-control aware request object verify_id_token fetches through
+                client = auth._get_client(firebase_admin.get_app())
+                client._token_verifier.request(url=_token_gen.ID_TOKEN_CERT_URI, method='GET')
+            except Exception as e:
+                print(f"Warning: Could not prefetch Firebase certificates: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=refresh, name='firebase-cert-prefetch', daemon=True)
+    thread.start()
+    return thread